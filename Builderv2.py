@@ -1,43 +1,70 @@
 from pathlib import Path
+import argparse
 import customtkinter as ctk
 import json
+import math
+import textwrap
+import threading
 import tkinter as tk
+from concurrent.futures import Future
+import tkinter.font as tkfont
+from talent_model import TalentGraph
+import data_cache
+import data_shards
+import data_watch
+import data_writer
+import profiling
+from edit_history import EditHistory
+from search_index import SearchIndex
+from path_query import PathQuery
+import build_solver
+from xp_engine import XPEngine, XPRules
+import tile_layout
+from tile_layout import (btn_width, btn_height, canvas_bg, default_tile_clr, initial_tile_posx, line_clr,
+                         tile_hlight_clr, tile_x_offset, tile_x_spacing, tile_y_offset, tile_y_spacing)
 
 
 ctk.set_appearance_mode("dark")
 
 
 
-def loadData(filename: str | None = None):
+def loadData(filename: str | None = None, use_cache: bool = True):
     here = Path(__file__).resolve().parent
     path = here / (filename or "data.json")   # default: data.json next to Builder.py
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    if data_shards.is_sharded(path):
+        # Manifest plus one file per tree; trees are read when a tab or character needs them
+        store = data_shards.ShardedStore(path)
+        graph, path = store.open(), store.manifest_path
+    else:
+        # Validated on first load, then read from the compiled data.json.cache
+        graph = data_cache.load_graph(path, use_cache=use_cache)
+    # Edits autosaved to the journal but not yet compacted into data.json
+    data_writer.replay_journal(graph, path)
+    return graph
     
-# Define talent tile GUI attributes
+# Define talent tile GUI attributes (tile geometry is shared with export_trees via tile_layout)
 default_btn_clr = "#3790cc"
-tile_hlight_clr = "#3aa7c9"
-default_tile_clr = "#3A5768"
-btn_width = 165
-btn_height = 100
-initial_tile_posx = 30
-initial_tile_posy = 300
+search_hit_clr = "#8a6fc4"
+path_hint_clr = "#c9913a"  # cheapest path to the hovered talent
+viewport_margin = 200  # virtual mode: materialise tiles this far outside the visible area
+zoom_step = 1.15
+zoom_limits = (0.25, 3.0)
 
 starting_xp = "10"
 
-def get_screen_res():
-    root_window = tk.Tk()
-    root_window.withdraw()
-    screen_width = root_window.winfo_screenwidth()
-    screen_height = root_window.winfo_screenheight()
-    root_window.destroy()
-    return screen_height
+def get_screen_res(root):
+    # Ask the app's own Tk root instead of spinning up a second interpreter
+    return root.winfo_screenheight()
 
 
 class TalentTile(ctk.CTkFrame):
-    def __init__(self, master, text="", textbox_text="", xp_text="", command=None, width=btn_width, height=btn_height, fg_color=default_tile_clr, **kwargs):
-        super().__init__(master, width=width, height=height, fg_color=default_tile_clr, corner_radius=8, **kwargs)
+    def __init__(self, master, text="", textbox_text="", xp_text="", command=None, width=btn_width, height=btn_height, fg_color=default_tile_clr, on_hover=None, **kwargs):
+        super().__init__(master, width=width, height=height, fg_color=fg_color, corner_radius=8, **kwargs)
         self.command = command
+        self.on_hover = on_hover  # called with True/False as the pointer enters/leaves the tile
+        self.base_size = (width, height)
+        self.window_item = None   # canvas window item showing this tile
+        self.zoom = 1
 
         # Main label
         self.label = ctk.CTkLabel(self, text=text, anchor="center")
@@ -54,14 +81,32 @@ class TalentTile(ctk.CTkFrame):
         self.bind("<Button-1>", self._on_click)
         self.label.bind("<Button-1>", self._on_click)
         self.textbox.bind("<Button-1>", self._on_click)
+        self.bind("<Enter>", self._on_enter)
+        self.bind("<Leave>", self._on_leave)
 
     def _on_click(self, event):
         if self.command:
             self.command()
 
+    def _on_enter(self, event):
+        if self.on_hover:
+            self.on_hover(True)
+
+    def _on_leave(self, event):
+        # Moving onto the label or textbox also leaves the frame; only report leaving the tile
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        while widget is not None:
+            if widget is self:
+                return
+            widget = widget.master
+        if self.on_hover:
+            self.on_hover(False)
+
     def configure(self, **kwargs):
         if "command" in kwargs:
             self.command = kwargs.pop("command")
+        if "on_hover" in kwargs:
+            self.on_hover = kwargs.pop("on_hover")
         if "text" in kwargs:
             self.label.configure(text=kwargs.pop("text"))
         if "textbox_text" in kwargs:
@@ -69,23 +114,287 @@ class TalentTile(ctk.CTkFrame):
             self.textbox.delete("1.0", "end")
             self.textbox.insert("1.0", kwargs.pop("textbox_text"))
             self.textbox.configure(state="disabled")
+        if "xp_text" in kwargs:
+            self.talent_xp_lbl.configure(text=kwargs.pop("xp_text"))
         if "fg_color" in kwargs:
             super().configure(fg_color=kwargs.pop("fg_color"))
         super().configure(**kwargs)
 
+    def hide(self):
+        # Taken off its canvas while waiting in the tile pool; _place_tile gives it a new window item
+        if self.window_item is not None:
+            self.master.delete(self.window_item)
+            self.window_item = None
+
+    def set_zoom(self, zoom):
+        # Scale the inner widgets too; resizing only the window item would show a clipped corner of the tile
+        if zoom == self.zoom:
+            return
+        width, height = self.base_size
+        family = ctk.ThemeManager.theme["CTkFont"]["family"]
+        self.label.configure(font=(family, max(1, round(13 * zoom))), height=28 * zoom)
+        self.textbox.configure(width=width * zoom, height=height * zoom, font=("TkDefaultFont", max(1, round(11 * zoom))))
+        self.textbox.pack_configure(padx=3 * zoom, pady=3 * zoom)
+        self.talent_xp_lbl.configure(font=("TkDefaultFont", max(1, round(11 * zoom)), "bold"), height=28 * zoom)
+        super().configure(width=width * zoom, height=height * zoom)
+        self.zoom = zoom
+
+
+class CanvasTile:
+    """Lightweight talent tile drawn as items on the tree's canvas.
+
+    Mirrors the parts of TalentTile the app uses (place, configure, destroy) so
+    either can be used as the tile renderer. Clicks are hit-tested by the
+    canvas through a per-tile tag instead of per-widget bindings.
+    """
+    _count = 0
+    _font_metrics = None  # (average char width, line height) for the body font
+
+    def __init__(self, master, text="", textbox_text="", xp_text="", command=None, width=btn_width, height=btn_height, fg_color=default_tile_clr, on_hover=None, **kwargs):
+        self.canvas = master
+        self.command = command
+        self.on_hover = on_hover
+        self.width = width
+        self.height = height
+        self.x = 0
+        self.y = 0
+        self.zoom = 1
+        self.hidden = False
+        CanvasTile._count += 1
+        self.tag = f"tile{CanvasTile._count}"
+        self._description = textbox_text
+
+        text_clr = _theme_color("CTkLabel", "text_color")
+        body_clr = _theme_color("CTkTextbox", "fg_color")
+        tags = ("tile", self.tag)
+        c = self.canvas
+        self._bg = c.create_polygon(_rounded_rect_points(0, 0, width, height, 8), smooth=True, fill=fg_color, outline="", tags=tags)
+        self._title = c.create_text(width / 2, 4, text=text, anchor="n", fill=text_clr, font=("TkDefaultFont", 12), width=width - 8, tags=tags)
+        self._body = c.create_rectangle(3, 28, width - 3, height - 3, fill=body_clr, outline="", tags=tags)
+        self._text = c.create_text(8, 31, text="", anchor="nw", fill=text_clr, font=("TkDefaultFont", 11), tags=tags)
+        self._xp_bg = c.create_rectangle(0, 0, 0, 0, fill="#222222", outline="", tags=tags)
+        self._xp = c.create_text(width * 0.96, height * 0.96, text=xp_text, anchor="se", fill=text_clr, font=("TkDefaultFont", 11, "bold"), tags=tags)
+        self._wrap_description()
+        self._fit_xp_badge()
+        c.tag_bind(self.tag, "<Button-1>", self._on_click)
+        # Crossing between this tile's own items gives Leave+Enter in one turn; recolours are coalesced
+        c.tag_bind(self.tag, "<Enter>", lambda e: self.on_hover and self.on_hover(True))
+        c.tag_bind(self.tag, "<Leave>", lambda e: self.on_hover and self.on_hover(False))
+
+    def _on_click(self, event):
+        if self.command:
+            self.command()
+
+    def _wrap_description(self):
+        # Canvas text can't scroll or clip, so wrap and truncate to the body area
+        if CanvasTile._font_metrics is None:
+            font = tkfont.Font(root=self.canvas, font=("TkDefaultFont", 11))
+            CanvasTile._font_metrics = (font.measure("abcdefghijklmnopqrstuvwxyz") / 26, font.metrics("linespace"))
+        char_w, line_h = CanvasTile._font_metrics
+        chars = max(1, int((self.width - 16) / char_w))
+        max_lines = max(1, int((self.height - 34) / line_h))
+        lines = []
+        for para in self._description.split("\n"):
+            lines.extend(textwrap.wrap(para, chars) or [""])
+        if len(lines) > max_lines:
+            lines = lines[:max_lines]
+            lines[-1] = lines[-1][:max(0, chars - 1)] + "…"
+        self.canvas.itemconfigure(self._text, text="\n".join(lines))
+
+    def _fit_xp_badge(self):
+        bbox = self.canvas.bbox(self._xp)
+        if bbox and self.canvas.itemcget(self._xp, "text"):
+            self.canvas.coords(self._xp_bg, bbox[0] - 2, bbox[1], bbox[2] + 2, bbox[3])
+        else:
+            self.canvas.coords(self._xp_bg, 0, 0, 0, 0)
+            self.canvas.itemconfigure(self._xp_bg, state="hidden")
+
+    def place(self, x=0, y=0, **kwargs):
+        self.canvas.move(self.tag, x - self.x, y - self.y)
+        self.x, self.y = x, y
+        if self.hidden:
+            self.canvas.itemconfigure(self.tag, state="normal")
+            self._fit_xp_badge()
+            self.hidden = False
+
+    def hide(self):
+        self.canvas.itemconfigure(self.tag, state="hidden")
+        self.hidden = True
+
+    def set_zoom(self, zoom):
+        # Scale the items about the tile's corner; fonts follow so the wrapped text still fits
+        if zoom == self.zoom:
+            return
+        f = zoom / self.zoom
+        c = self.canvas
+        c.scale(self.tag, self.x, self.y, f, f)
+        c.itemconfigure(self._title, font=("TkDefaultFont", max(1, round(12 * zoom))), width=(self.width - 8) * zoom)
+        c.itemconfigure(self._text, font=("TkDefaultFont", max(1, round(11 * zoom))))
+        c.itemconfigure(self._xp, font=("TkDefaultFont", max(1, round(11 * zoom)), "bold"))
+        self.zoom = zoom
+        self._fit_xp_badge()
+
+    def configure(self, **kwargs):
+        if "command" in kwargs:
+            self.command = kwargs.pop("command")
+        if "on_hover" in kwargs:
+            self.on_hover = kwargs.pop("on_hover")
+        if "text" in kwargs:
+            self.canvas.itemconfigure(self._title, text=kwargs.pop("text"))
+        if "textbox_text" in kwargs:
+            self._description = kwargs.pop("textbox_text")
+            self._wrap_description()
+        if "xp_text" in kwargs:
+            self.canvas.itemconfigure(self._xp, text=kwargs.pop("xp_text"))
+            self.canvas.itemconfigure(self._xp_bg, state="normal")
+            self._fit_xp_badge()
+        if "fg_color" in kwargs:
+            self.canvas.itemconfigure(self._bg, fill=kwargs.pop("fg_color"))
+
+    def destroy(self):
+        self.canvas.delete(self.tag)
+
+
+def _rounded_rect_points(x1, y1, x2, y2, r):
+    # Control points for a smoothed polygon that renders as a rounded rectangle
+    return [x1 + r, y1, x2 - r, y1, x2, y1, x2, y1 + r, x2, y2 - r, x2, y2,
+            x2 - r, y2, x1 + r, y2, x1, y2, x1, y2 - r, x1, y1 + r, x1, y1]
+
+
+def _theme_color(widget, key):
+    color = ctk.ThemeManager.theme[widget][key]
+    if isinstance(color, (list, tuple)):
+        return color[1] if ctk.get_appearance_mode() == "Dark" else color[0]
+    return color
+
+
+# Tile renderers selectable with TalentTreeApp(renderer=...)
+tile_renderers = {"widget": TalentTile, "canvas": CanvasTile}
+
+
+class TilePool:
+    """Released tiles kept for reuse instead of being destroyed and rebuilt.
+
+    Tk widgets can't change parent, so free tiles are kept per canvas and
+    tile size. acquire() reconfigures a free tile (text, description, XP
+    label, colour, command) or builds a new one; release() hides a tile for
+    later reuse, or destroys it once the pool holds ``limit`` tiles.
+    """
+    def __init__(self, limit=300):
+        self.limit = limit
+        self.free = {}  # {(canvas, width, height): [tile, ...]}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def acquire(self, tile_cls, canvas, width, height, **options):
+        key = (canvas, width, height)
+        stack = self.free.get(key)
+        if stack:
+            tile = stack.pop()
+            self.size -= 1
+            self.hits += 1
+            tile.configure(**options)
+        else:
+            self.misses += 1
+            tile = tile_cls(canvas, width=width, height=height, **options)
+            tile.pool_key = key
+        return tile
+
+    def release(self, tile):
+        key = getattr(tile, "pool_key", None)
+        tile.hide()
+        if key is None or self.size >= self.limit:
+            self.discarded += 1
+            tile.destroy()
+            return
+        tile.configure(command=None, on_hover=None)  # don't keep the old talent alive through the lambdas
+        self.free.setdefault(key, []).append(tile)
+        self.size += 1
+
+    def forget_canvas(self, canvas):
+        # Drop free tiles of a canvas that is being destroyed
+        for key in [k for k in self.free if k[0] is canvas]:
+            self.size -= len(self.free.pop(key))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "discarded": self.discarded,
+                "free": self.size, "hit_rate": round(self.hits / lookups, 3) if lookups else None}
+
+
+class TileColorScheduler:
+    """Coalesces tile recolours into one diff-based flush per event-loop turn.
+
+    The intended colour of a tile comes from its state: a mark in one of the
+    layers (highest priority first), else selected or not. Callers invalidate
+    the tiles whose state changed; the flush compares intended colours with
+    what is painted and only configures tiles that actually differ.
+    """
+    def __init__(self, app, layers=("edit",)):
+        self.app = app
+        self.layers = {name: {} for name in layers}  # {layer: {(tree_name, id): color}}
+        self.painted = {}   # {(tree_name, id): color currently on screen}
+        self.dirty = set()
+        self._pending = None
+
+    def intended(self, key):
+        for marks in self.layers.values():
+            if key in marks:
+                return marks[key]
+        return tile_hlight_clr if key in self.app.selected_talents else default_tile_clr
+
+    def mark(self, layer, key, color):
+        self.layers[layer][key] = color
+        self.invalidate(key)
+
+    def unmark(self, layer, key):
+        if self.layers[layer].pop(key, None) is not None:
+            self.invalidate(key)
+
+    def clear_layer(self, layer):
+        marks = self.layers[layer]
+        self.invalidate(*marks)
+        marks.clear()
+
+    def painted_as(self, key, color):
+        # Record the colour a freshly created tile was built with
+        self.painted[key] = color
+        self.dirty.discard(key)
+
+    def invalidate(self, *keys):
+        self.dirty.update(keys)
+        if self.dirty and self._pending is None:
+            self._pending = self.app.after_idle(self.flush)
+
+    def flush(self):
+        self._pending = None
+        for key in self.dirty:
+            tree_buttons = self.app.talent_buttons.get(key[0])
+            if not tree_buttons or key[1] not in tree_buttons:
+                continue  # tile not built yet; it gets its colour when created
+            color = self.intended(key)
+            if self.painted.get(key) != color:
+                tree_buttons[key[1]][0].configure(fg_color=color)
+                self.painted[key] = color
+        self.dirty.clear()
+
 
 
 class TalentTreeApp(ctk.CTk):
-    def __init__(self, data):
+    def __init__(self, data, lazy_tabs=True, prebuild_tabs=False, renderer="widget", journal=False, autosave_ms=2000, xp_rules=None, virtual=False, data_path=None, watch=False, watch_ms=500):
         super().__init__()
         self.title("Talent Tree Builder")
-        if get_screen_res() > 1200:
+        with profiling.span("screen probe"):
+            screen_height = get_screen_res(self)
+        if screen_height > 1200:
             self.geometry("1520x1100")
         else:
             self.geometry("1520x900")
-        self.data = data
+        # Accept either a loaded TalentGraph or a raw data.json dict
+        self.model = data if isinstance(data, TalentGraph) else TalentGraph.from_dict(data)
 
-        self.selected_talents = set()
         self.edit_connection_mode = False
         self.edit_position_mode = False
         self.edit_text_mode = False
@@ -93,10 +402,32 @@ class TalentTreeApp(ctk.CTk):
         self.pos_edit_buffer = None
         self.text_edit_buffer = None
         self.talent_buttons = {}  # {tree_name: {id: (button, position)}}
-        self.tier_xp_values = [4, 6, 8, 8, 10, 10]
-        self.tree_xp_cost = 8
-        self.xp_spent = 0
+        self.colors = TileColorScheduler(self, layers=("edit", "path", "search"))
+        self.tile_anchors = {}    # {tree_name: {id: (x, y)}} cached line endpoints per tile
+        self.xp = XPEngine(self.model, xp_rules or XPRules(tier_xp_values=[4, 6, 8, 8, 10, 10], tree_xp_cost=8))
         self.xp_total = int(starting_xp)
+        self.build_weights = None           # {(tree_name, talent_id): weight} for Suggest Build, from a weights file
+        self.suggestion = None              # (Future, picks, xp_total, missing) while Suggest Build is solving
+        self.lazy_tabs = lazy_tabs          # only build a tree's tiles when its tab is first shown
+        self.prebuild_tabs = prebuild_tabs  # build the remaining tabs in idle time after startup
+        self.tile_cls = tile_renderers[renderer]
+        self.virtual = virtual              # only materialise tiles/lines near the visible scroll region
+        self.tile_pool = TilePool(limit=300)
+        # Saves run on a background thread; with journal=True edits are autosaved to data.json.journal
+        store = self.model.source
+        if store is not None:
+            data_path = store.manifest_path
+        self.writer = data_writer.DataWriter(data_path or Path(__file__).resolve().parent / "data.json", journal=journal, store=store)
+        self.autosave_ms = autosave_ms
+        self.history = EditHistory(limit=500)
+        # Reload data.json when it's edited outside the app (single-file data only)
+        self.watcher = None
+        self.watch_ms = watch_ms
+        if watch and store is None:
+            self.watcher = data_watch.DataWatcher(self.writer.path, ignore=lambda stamp: stamp == self.writer.written_stamp,
+                                                  tier_count=len(self.xp.rules.tier_xp_values))
+        self.search = SearchIndex.from_graph(self.model)
+        self.paths = PathQuery(self.model, self.xp.rules)
 
         #== UI Elements ==
         self.grid_rowconfigure(1, weight=1)
@@ -128,6 +459,10 @@ class TalentTreeApp(ctk.CTk):
         self.load_char_btn.grid(row=0, column=2, padx=5, pady=5)
         self.save_char_btn = ctk.CTkButton(self.info_btn_frame, text="Save Character", command=self.save_character)
         self.save_char_btn.grid(row=0, column=1, padx=5, pady=5)
+        self.suggest_btn = ctk.CTkButton(self.info_btn_frame, text="Suggest Build", command=self.suggest_build)
+        self.suggest_btn.grid(row=0, column=3, padx=5, pady=5)
+        self.weights_btn = ctk.CTkButton(self.info_btn_frame, width=60, text="Weights", command=self.load_build_weights)
+        self.weights_btn.grid(row=0, column=4, padx=5, pady=5)
 
         self.edit_text_btn = ctk.CTkButton(self.info_btn_frame, text="Edit: Text", command=self.toggle_edit_text_mode)
         self.edit_text_btn.grid(row=1, column=0, padx=5, pady=5)
@@ -137,16 +472,47 @@ class TalentTreeApp(ctk.CTk):
         self.edit_conn_btn.grid(row=1, column=2, padx=5, pady=5)
         self.save_json_btn = ctk.CTkButton(self.info_btn_frame, text="Save Changes", command=self.save_data)
         self.save_json_btn.grid(row=1, column=3, padx=5, pady=5)
+        self.undo_btn = ctk.CTkButton(self.info_btn_frame, width=60, text="Undo", command=self.undo)
+        self.undo_btn.grid(row=1, column=4, padx=5, pady=5)
+        self.redo_btn = ctk.CTkButton(self.info_btn_frame, width=60, text="Redo", command=self.redo)
+        self.redo_btn.grid(row=1, column=5, padx=5, pady=5)
+        self.bind("<Control-z>", self._tree_shortcut(self.undo))
+        self.bind("<Control-y>", self._tree_shortcut(self.redo))
+        self.bind("<Control-Z>", self._tree_shortcut(self.redo))  # Ctrl+Shift+Z
+
+        # Search
+        self.search_frame = ctk.CTkFrame(self.info_frame)
+        self.search_frame.place(relx=.84, rely=.2)
+        self.search_entry = ctk.CTkEntry(self.search_frame, width=200, placeholder_text="Search talents")
+        self.search_entry.grid(row=0, column=0, padx=5, pady=5)
+        self.search_entry.bind("<KeyRelease>", self.on_search)
+        self.search_lbl = ctk.CTkLabel(self.search_frame, text="")
+        self.search_lbl.grid(row=1, column=0, padx=5)
+        self.path_lbl = ctk.CTkLabel(self.info_frame, text="")
+        self.path_lbl.place(relx=.3, rely=.8)
 
         #= Tree frame =
         self.tree_frame = ctk.CTkFrame(self)
         self.tree_frame.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
 
-        self.tabs = ctk.CTkTabview(self.tree_frame)
+        self.tabs = ctk.CTkTabview(self.tree_frame, command=self.on_tab_change)
         self.tabs.pack(fill="both", expand=True)
         self.tab_frames = {}
 
         self.build_tabs()
+        # Tab canvases aren't CTkScrollableFrames, so route the wheel ourselves
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_all(sequence, self._on_canvas_wheel, add="+")
+        # Ctrl+wheel zooms the tree under the pointer (tile widgets would swallow canvas bindings)
+        for sequence in ("<Control-MouseWheel>", "<Control-Button-4>", "<Control-Button-5>"):
+            self.bind_all(sequence, self._on_zoom_wheel)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        if journal:
+            self.after(self.autosave_ms, self._autosave)
+        if self.watcher is not None:
+            self.after(self.watch_ms, self._poll_reload)
+        if profiling.enabled:
+            self.after_idle(self._sample_widgets, "startup")
 
 
 
@@ -160,37 +526,34 @@ class TalentTreeApp(ctk.CTk):
             self.open_text_editor(tree_name, talent_id)
         # Normal tile select
         else:
-            # Exception for initial tree talent (negative position)
-            if column < 0:
-                btn_xp = 0
-            else:
-                btn_xp = self.tier_xp_values[column]
-            btn, _ = self.talent_buttons[tree_name][talent_id]
-            key = (tree_name, talent_id)
-            
-            def get_tree_xp():
-                distinct_trees = len({tree for tree, _ in self.selected_talents})
-                if distinct_trees > 2:
-                    tree_sum = distinct_trees - 2
-                    return tree_sum * self.tree_xp_cost
-                else:
-                    return 0
-                
-            # add/subtract xp and set tile color
-            if key in self.selected_talents:
-                # Unselect talent
-                tree_xp_total = get_tree_xp()
-                self.selected_talents.remove(key)
-                btn.configure(fg_color=default_tile_clr)
-                self.xp_spent -= btn_xp + tree_xp_total
-                self.xp_remaining_val.configure(text=(self.xp_total - self.xp_spent))
-            else:
-                # Select talent
-                self.selected_talents.add(key)
-                btn.configure(fg_color=tile_hlight_clr)
-                tree_xp_total = get_tree_xp()
-                self.xp_spent += btn_xp + tree_xp_total
-                self.xp_remaining_val.configure(text=(self.xp_total - self.xp_spent))
+            # XP engine updates the total; the scheduler repaints the tile
+            self.xp.toggle(tree_name, talent_id)
+            self.colors.invalidate((tree_name, talent_id))
+            self.update_xp_label()
+            self.on_talent_hover(tree_name, talent_id, True)  # the pointer is still over it
+
+
+    def on_talent_hover(self, tree_name, talent_id, entered):
+        # Highlight the cheapest way to reach a hovered, unselected talent
+        self.colors.clear_layer("path")
+        editing = self.edit_connection_mode or self.edit_position_mode or self.edit_text_mode
+        if not entered or editing or (tree_name, talent_id) in self.selected_talents:
+            self.path_lbl.configure(text="")
+            return
+        xp, path = self.paths.cheapest_path(tree_name, talent_id, self.selected_talents)
+        for key in path:
+            self.colors.mark("path", (tree_name, key), path_hint_clr)
+        talent = self.model.talent(tree_name, talent_id)
+        self.path_lbl.configure(text=f"{talent.name}: {xp} XP over {len(path)} talent(s), {self.xp.remaining(self.xp_total) - xp} XP left after")
+
+
+    @property
+    def selected_talents(self):
+        return self.xp.selected
+
+    @property
+    def xp_spent(self):
+        return self.xp.spent
 
 
     #= Toggle button modes =
@@ -202,6 +565,7 @@ class TalentTreeApp(ctk.CTk):
         else:
             self.edit_conn_btn.configure(fg_color=default_btn_clr)
             self.connection_edit_buffer = None
+            self.colors.clear_layer("edit")
 
     def toggle_edit_position_mode(self):
         self.edit_position_mode = not self.edit_position_mode
@@ -211,6 +575,7 @@ class TalentTreeApp(ctk.CTk):
         else:
             self.edit_pos_btn.configure(fg_color=default_btn_clr)
             self.pos_edit_buffer = None
+            self.colors.clear_layer("edit")
     
     def toggle_edit_text_mode(self):
         self.edit_text_mode = not self.edit_text_mode
@@ -224,67 +589,38 @@ class TalentTreeApp(ctk.CTk):
 
     #= Button functions =
     def handle_connection_edit(self, tree_name, talent_id):
-        btn, _ = self.talent_buttons[tree_name][talent_id]
         if self.connection_edit_buffer is None:
             self.connection_edit_buffer = talent_id
-            btn.configure(fg_color="yellow")
+            self.colors.mark("edit", (tree_name, talent_id), "yellow")
         else:
             from_id = self.connection_edit_buffer
             to_id = talent_id
             self.modify_connection(tree_name, from_id, to_id)
             self.connection_edit_buffer = None
 
-            # Reset all button colors
-            for tid, (b, _) in self.talent_buttons[tree_name].items():
-                key = (tree_name, tid)
-                if key in self.selected_talents:
-                    b.configure(fg_color=tile_hlight_clr)
-                else:
-                    b.configure(fg_color=default_tile_clr)
-            
-            # Get tab info
-            this_tab_name = self.tabs.get()
-            this_tab = self.tabs.tab(this_tab_name)
-            frame = self.tab_frames[tree_name]
-            canvas = frame.canvas
-            
-            # Clear lines then draw new ones
-            for line in canvas.lines:
-                canvas.delete(line)
-            canvas.lines.clear()
-            
-            tree_data = self.data["trees"][this_tab.tree_index]
-            self.draw_connections(tree_data, canvas)
+            # Reset the buffered button color
+            self.colors.unmark("edit", (tree_name, from_id))
     
     def handle_pos_edit(self, tree_name, talent_id):
-        btn, _ = self.talent_buttons[tree_name][talent_id]
         if self.pos_edit_buffer is None:
             self.pos_edit_buffer = talent_id
-            btn.configure(fg_color="yellow")
+            self.colors.mark("edit", (tree_name, talent_id), "yellow")
         else:
             from_id = self.pos_edit_buffer
             to_id = talent_id
             self.modify_position(tree_name, from_id, to_id)
             self.pos_edit_buffer = None
 
-            # Reset all button colors
-            for tid, (b, _) in self.talent_buttons[tree_name].items():
-                key = (tree_name, tid)
-                if key in self.selected_talents:
-                    b.configure(fg_color=tile_hlight_clr)
-                else:
-                    b.configure(fg_color=default_tile_clr)
-            
-            self.reset_tab()    
+            # Reset the buffered button color
+            self.colors.unmark("edit", (tree_name, from_id))
     
     def open_text_editor(self, tree_name, talent_id):
         # get talent data
-        tree = next(t for t in self.data["trees"] if t["name"] == tree_name)
-        talent = next(t for t in tree["talents"] if t["id"] == talent_id)
+        talent = self.model.talent(tree_name, talent_id)
 
         # create modal window
         top = ctk.CTkToplevel(self)
-        top.title(f"Edit Talent — {talent.get('name','')}")
+        top.title(f"Edit Talent — {talent.name}")
         top.transient(self)
         top.grab_set()
 
@@ -292,13 +628,13 @@ class TalentTreeApp(ctk.CTk):
         ctk.CTkLabel(top, text="Title:").grid(row=0, column=0, padx=8, pady=(8,4), sticky="w")
         title_entry = ctk.CTkEntry(top, width=400)
         title_entry.grid(row=1, column=0, padx=8, pady=(0,8), sticky="we")
-        title_entry.insert(0, talent.get("name", ""))
+        title_entry.insert(0, talent.name)
 
         # Body (description)
         ctk.CTkLabel(top, text="Description:").grid(row=2, column=0, padx=8, pady=(4,4), sticky="w")
         body_tb = ctk.CTkTextbox(top, width=400, height=200, wrap="word")
         body_tb.grid(row=3, column=0, padx=8, pady=(0,8), sticky="nsew")
-        body_text = talent.get("description", talent.get("text", ""))
+        body_text = talent.description
         if body_text:
             body_tb.insert("1.0", body_text)
 
@@ -308,14 +644,8 @@ class TalentTreeApp(ctk.CTk):
         def on_save():
             new_title = title_entry.get().strip()
             new_body = body_tb.get("1.0", "end").rstrip("\n")
-            # persist to data
-            talent["name"] = new_title
-            # store under "description"
-            talent["description"] = new_body
-
-            # update UI button/label
-            btn, _ = self.talent_buttons[tree_name][talent_id]
-            btn.configure(text=new_title, textbox_text=new_body)
+            # persist to the model (saved under "description") and update the tile
+            self.edit(self.model.text_edit(tree_name, talent_id, new_title, new_body))
 
             top.grab_release()
             top.destroy()
@@ -336,8 +666,9 @@ class TalentTreeApp(ctk.CTk):
         top.grid_rowconfigure(3, weight=1)
         top.grid_columnconfigure(0, weight=1)
 
-    def load_character(self):
-        path = tk.filedialog.askopenfilename(title="Open character JSON", filetypes=[("JSON Files","*.json"),("All files","*.*")])
+    def load_character(self, path=None):
+        if path is None:
+            path = tk.filedialog.askopenfilename(title="Open character JSON", filetypes=[("JSON Files","*.json"),("All files","*.*")])
         if not path:
             return
         try:
@@ -349,18 +680,25 @@ class TalentTreeApp(ctk.CTk):
             return
         
         # restore selected talents (stored as list of [tree_name, talent_id])
+        # xp_spent is recomputed from the selection in one pass rather than trusted
         sel = char_save.get("selected_talents", [])
         try:
-            self.selected_talents = set((t[0], t[1]) for t in sel)
+            for tree_name in {t[0] for t in sel}:
+                if tree_name in self.model.trees_by_name:
+                    self.ensure_tree(tree_name)
         except Exception:
-            self.selected_talents = set()
-        # Restore xp
+            pass  # malformed entries are reported by xp.load below
+        before = set(self.selected_talents)
         try:
-            self.xp_total = int(char_save.get("xp_total", self.xp_total))
+            unknown = self.xp.load((t[0], t[1]) for t in sel)
         except Exception:
-            pass
+            unknown = []
+            self.xp.clear()
+        if unknown:
+            print("Skipped unknown talents:", unknown)
+        # Restore xp
         try:
-            self.xp_spent = int(char_save.get("xp_spent", self.xp_spent))
+            self.xp_total = int(char_save.get("xp_total", self.xp_total))
         except Exception:
             pass
         try:
@@ -368,17 +706,81 @@ class TalentTreeApp(ctk.CTk):
             self.xp_entry.insert(0, str(self.xp_total))
         except Exception:
             pass
-        self.xp_remaining_val.configure(text=(self.xp_total - self.xp_spent))
-
-        # update tile colors to reflect selection
-        for tree_name, talents in self.talent_buttons.items():
-            for tid, (btn, _) in talents.items():
-                key = (tree_name, tid)
-                if key in self.selected_talents:
-                    btn.configure(fg_color=tile_hlight_clr)
-                else:
-                    btn.configure(fg_color=default_tile_clr)
-        
+        self.update_xp_label()
+
+        # Only tiles whose selection changed need repainting
+        self.colors.invalidate(*(before ^ self.selected_talents))
+
+    def load_build_weights(self, path=None):
+        # {"TREE:ID": weight} file for Suggest Build; cancelling the dialog goes back to equal weights
+        if path is None:
+            path = tk.filedialog.askopenfilename(title="Open build weights JSON", filetypes=[("JSON Files","*.json"),("All files","*.*")])
+        if not path:
+            self.build_weights = None
+            self.weights_btn.configure(text="Weights")
+            return
+        try:
+            self.build_weights = build_solver.load_weights(path)
+        except Exception as e:
+            print("Failed to load weights:", e)
+            return
+        self.weights_btn.configure(text=f"Weights ({len(self.build_weights)})")
+
+    def suggest_build(self):
+        # Fill the XP total around the current picks; unlisted talents weigh 1, placeholders 0
+        if self.suggestion is not None:
+            return
+        xp, missing = build_solver.check_selection(self.model, self.selected_talents, self.xp.rules)
+        if xp > self.xp_total:
+            print(f"The current picks already cost {xp} XP, more than the XP total of {self.xp_total}")
+            return
+        # Snapshot the model here; the solve itself runs on a worker thread so the window stays responsive
+        problems = build_solver.build_problems(self.model, self.xp.rules, self.build_weights, self.selected_talents)
+        future = Future()
+
+        def solve(budget=self.xp_total, rules=self.xp.rules):
+            try:
+                future.set_result(build_solver.solve_problems(problems, budget, rules))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=solve, name="build-solver", daemon=True).start()
+        self.suggestion = (future, frozenset(self.selected_talents), self.xp_total, missing)
+        self.suggest_btn.configure(state="disabled", text="Solving...")
+        self.after(50, self._poll_suggestion)
+
+    def _poll_suggestion(self):
+        future, picks, xp_total, missing = self.suggestion
+        if not future.done():
+            self.after(50, self._poll_suggestion)
+            return
+        self.suggestion = None
+        self.suggest_btn.configure(state="normal", text="Suggest Build")
+        try:
+            build = future.result()
+        except Exception as e:
+            print("Suggest Build failed:", e)
+            return
+        if picks != self.selected_talents or xp_total != self.xp_total:
+            print("The picks or XP total changed while solving; press Suggest Build again")
+            return
+        if build is None:
+            if missing:
+                # Clicks don't enforce prerequisites, so the picks can skip them
+                print("Not enough XP left to add the missing prerequisites of:",
+                      ", ".join(f"{tree_name}:{talent_id}" for tree_name, talent_id in missing))
+            else:
+                print("No build fits the current XP total")
+            return
+        if not build.exact:
+            print("Suggest Build hit its search cap; a better build may exist")
+        before = set(self.selected_talents)
+        unknown = self.xp.load(build.talents)
+        if unknown:
+            print("Skipped talents removed while solving:", unknown)
+        self.update_xp_label()
+        self.colors.invalidate(*(before ^ self.selected_talents))
+
     def save_character(self):
         # Build character file
         char_save = {
@@ -402,126 +804,632 @@ class TalentTreeApp(ctk.CTk):
     #==== GUI functions ====
     def set_xp_total(self):
         self.xp_total = int(self.xp_entry.get())
-        self.xp_remaining_val.configure(text=(self.xp_total - self.xp_spent))
+        self.update_xp_label()
+
+    def on_search(self, event=None):
+        hits = self.mark_search_hits()
+
+        # Focus the first tree with a match unless the current one has some
+        current = self.tabs.get()
+        hit_trees = {tree_name for tree_name, _ in hits}
+        if hit_trees and current not in hit_trees:
+            first = next(tree.name for tree in self.model.trees if tree.name in hit_trees)
+            self.tabs.set(first)
+            self.build_tab(first)
+
+    def mark_search_hits(self):
+        # Highlight the current query's matches; returns them
+        query = self.search_entry.get()
+        hits = self.search.query(query) if query.strip() else set()
+        self.colors.clear_layer("search")
+        for key in hits:
+            self.colors.mark("search", key, search_hit_clr)
+        self.search_lbl.configure(text=f"{len(hits)} matches" if query.strip() else "")
+        return hits
+
+    def update_xp_label(self):
+        self.xp_remaining_val.configure(text=self.xp.remaining(self.xp_total))
 
     
     def populate_tab(self, tab, tree):
-        frame = ctk.CTkScrollableFrame(tab, width=850, height=650)
+        # A canvas sized to the whole tree with its own scrollbars, so zooming in can reach every tile
+        frame = ctk.CTkFrame(tab)
         frame.pack(fill="both", expand=True)
-        frame.canvas = ctk.CTkCanvas(frame, width=850, height=870, bg="#252525")
-        frame.canvas.pack(fill="both", expand=True)
-        frame.canvas.lines = []
-        self.tab_frames[tree["name"]] = frame
-        tab_lbl = ctk.CTkLabel(frame.canvas, text=tree["name"], font=("TkDefaultFont", 30))
-        tab_lbl.place(relx=.03, rely=.05)
-
-        self.talent_buttons[tree["name"]] = {}
+        frame.grid_rowconfigure(0, weight=1)
+        frame.grid_columnconfigure(0, weight=1)
+        canvas = frame.canvas = ctk.CTkCanvas(frame, width=850, height=650, bg=canvas_bg, highlightthickness=0)
+        canvas.grid(row=0, column=0, sticky="nsew")
+        y_bar = ctk.CTkScrollbar(frame, command=canvas.yview)
+        y_bar.grid(row=0, column=1, sticky="ns")
+        x_bar = ctk.CTkScrollbar(frame, orientation="horizontal", command=canvas.xview)
+        x_bar.grid(row=1, column=0, sticky="ew")
+        canvas.configure(yscrollcommand=lambda *a: self._on_canvas_scroll(tree.name, y_bar, *a),
+                         xscrollcommand=lambda *a: self._on_canvas_scroll(tree.name, x_bar, *a))
+        canvas.lines = {}  # {(from_id, to_id): line_id}; virtual tabs only hold lines of materialised tiles
+        canvas.virtual = self.virtual
+        canvas.pending = None
+        if canvas.virtual:
+            canvas.bind("<Configure>", lambda e: self._schedule_viewport(tree.name))
+        self._init_view(tree.name, canvas)
+        self.tab_frames[tree.name] = frame
+        canvas.create_text(25, 30, text=tree.name, anchor="nw", fill=_theme_color("CTkLabel", "text_color"), font=("TkDefaultFont", 30))
+        self.layout_tab(tree, canvas)
+
+
+    def layout_tab(self, tree, canvas):
+        # Lay a tree's tiles and lines out on an empty tab canvas
+        self.talent_buttons[tree.name] = {}
+        self.tile_anchors[tree.name] = {}
+        if canvas.virtual:
+            self._layout_virtual_tab(tree, canvas)
+            return
 
         # Place buttons
-        for talent in tree["talents"]:
-            x, y = talent["position"]
-            x_offset = 275
-            y_offset = 30
-            x_spacing = 200
-            y_spacing =  170
-            btn_xp = f"{self.tier_xp_values[x]} XP"
-
-            # Exception for the main tree talent (denoted by negative position)
-            if x < 0 and y < 0:
-                btn_xp = ""
-                px, py = initial_tile_posx, initial_tile_posy
-                btn = TalentTile(frame.canvas, text=talent["name"], textbox_text=talent["description"], xp_text=btn_xp, width=(btn_width * 1.2), height=(btn_height * 2.5), fg_color=default_tile_clr)
-            # Normal talent tiles
-            else:
-                btn_xp = f"{self.tier_xp_values[x]} XP"
-                px, py = x_offset + x * x_spacing, y_offset + y * y_spacing
-                btn = TalentTile(frame.canvas, text=talent["name"], textbox_text=talent["description"], xp_text=btn_xp, width=btn_width, height=btn_height, fg_color=tile_hlight_clr)
-            btn.place(x=px, y=py)
-            btn.configure(command=lambda t_id=talent["id"], t_name=tree["name"], column=x, row=y: self.on_talent_click(t_name, t_id, column, row))
-            self.talent_buttons[tree["name"]][talent["id"]] = (btn, (px, py))
-            key = (tree["name"], talent["id"])
-            if key in self.selected_talents:
-                btn.configure(fg_color=tile_hlight_clr)
+        for talent in tree:
+            self.create_tile(tree.name, canvas, talent)
 
         # Draw connection lines
-        self.draw_connections(tree, frame.canvas)
+        self.draw_connections(tree, canvas)
+        self._update_scrollregion(tree, canvas)
+
+
+    #==== Virtualised tabs ====
+    def _layout_virtual_tab(self, tree, canvas):
+        # Anchors exist for every talent so lines can be drawn to off-screen tiles
+        for talent in tree:
+            px, py, _, _, _ = self._tile_layout(talent)
+            self._cache_anchor(tree.name, talent.id, px, py)
+        self._update_scrollregion(tree, canvas)
+        self._schedule_viewport(tree.name)
+
+
+    def _on_canvas_scroll(self, tree_name, bar, first, last):
+        bar.set(first, last)
+        self._schedule_viewport(tree_name)
+
+
+    def _canvas_under_pointer(self, event):
+        # The current tab's canvas if the pointer is over it (or over one of its tiles)
+        frame = self.tab_frames.get(self.tabs.get())
+        if frame is None:
+            return None
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        while widget is not None and widget is not frame.canvas:
+            widget = widget.master
+        return frame.canvas if widget is not None else None
+
+    def _on_canvas_wheel(self, event):
+        # Scroll the current tab's canvas when the pointer is over it
+        canvas = self._canvas_under_pointer(event)
+        if canvas is None or event.state & 0x4:  # Ctrl+wheel zooms instead
+            return
+        if event.num == 4 or event.delta > 0:
+            step = -1
+        else:
+            step = 1
+        if event.state & 0x1:  # Shift scrolls sideways
+            canvas.xview_scroll(step, "units")
+        else:
+            canvas.yview_scroll(step, "units")
+
+
+    #==== Zoom and pan ====
+    def _init_view(self, tree_name, canvas):
+        canvas.zoom = 1.0
+        canvas.zoom_pending = None  # (target zoom, pointer x, pointer y) waiting for an idle pass
+        canvas.panning = False
+        # Drag the background to pan; drags that start on a canvas-drawn tile are clicks
+        canvas.bind("<ButtonPress-1>", lambda e: self._start_pan(canvas, e))
+        canvas.bind("<B1-Motion>", lambda e: self._drag_pan(canvas, e))
+        canvas.bind("<ButtonRelease-1>", lambda e: setattr(canvas, "panning", False))
+
+    def _start_pan(self, canvas, event):
+        canvas.panning = "tile" not in canvas.gettags("current")
+        if canvas.panning:
+            canvas.scan_mark(event.x, event.y)
+
+    def _drag_pan(self, canvas, event):
+        if canvas.panning:
+            canvas.scan_dragto(event.x, event.y, gain=1)
+
+    def _on_zoom_wheel(self, event):
+        canvas = self._canvas_under_pointer(event)
+        if canvas is None:
+            return
+        factor = zoom_step if event.num == 4 or event.delta > 0 else 1 / zoom_step
+        target = canvas.zoom_pending[0] if canvas.zoom_pending else canvas.zoom
+        x, y = event.x_root - canvas.winfo_rootx(), event.y_root - canvas.winfo_rooty()
+        if canvas.zoom_pending is None:
+            # Fast wheel spins arrive as bursts; apply them as one zoom per idle pass
+            self.after_idle(self.zoom_tab, self.tabs.get())
+        canvas.zoom_pending = (target * factor, x, y)
+        return "break"
+
+    def zoom_tab(self, tree_name, zoom=None, x=None, y=None):
+        """Zoom a built tab to zoom, keeping canvas pixel (x, y) (default: centre) in place.
+
+        Lines are scaled with a canvas transform; tiles are moved and resized in place.
+        """
+        canvas = self.tab_frames[tree_name].canvas
+        if zoom is None:
+            zoom, x, y = canvas.zoom_pending
+        canvas.zoom_pending = None
+        zoom = min(max(zoom, zoom_limits[0]), zoom_limits[1])
+        if zoom == canvas.zoom:
+            return
+        if x is None:
+            x, y = canvas.winfo_width() / 2, canvas.winfo_height() / 2
+        f = zoom / canvas.zoom
+        focus_x, focus_y = canvas.canvasx(x) * f, canvas.canvasy(y) * f
+        canvas.zoom = zoom
+
+        canvas.scale("line", 0, 0, f, f)
+        canvas.itemconfigure("line", width=max(1, round(2 * zoom)))
+        for btn, (px, py) in self.talent_buttons[tree_name].values():
+            self._place_tile(canvas, btn, px, py)
+
+        width, height = self._update_scrollregion(self.model.tree(tree_name), canvas)
+        canvas.xview_moveto((focus_x - x) / width)
+        canvas.yview_moveto((focus_y - y) / height)
+        if canvas.virtual:
+            self._schedule_viewport(tree_name)
+
+    def _update_scrollregion(self, tree, canvas):
+        width, height = tile_layout.tree_extent(tree)
+        width, height = width * canvas.zoom, height * canvas.zoom
+        canvas.configure(scrollregion=(0, 0, width, height))
+        return width, height
+
+    def _line_coords(self, tree_name, canvas, from_id, to_id):
+        # Anchors are in layout coordinates; the canvas shows them scaled by its zoom
+        anchors = self.tile_anchors[tree_name]
+        (x1, y1), (x2, y2) = anchors[from_id], anchors[to_id]
+        zoom = canvas.zoom
+        return x1 * zoom, y1 * zoom, x2 * zoom, y2 * zoom
+
+
+    def _schedule_viewport(self, tree_name):
+        # Coalesce scroll/resize events into one refresh per idle pass
+        canvas = self.tab_frames[tree_name].canvas
+        if canvas.virtual and canvas.pending is None:
+            canvas.pending = self.after_idle(self._update_viewport, tree_name)
+
+
+    def _visible_talents(self, tree, x0, y0, x1, y1):
+        """Ids of talents whose tiles intersect the canvas rectangle (x0, y0)-(x1, y1)."""
+        # Normal tiles sit on a grid, so the rectangle maps straight to column/row ranges
+        first_col = max(0, math.ceil((x0 - tile_x_offset - btn_width) / tile_x_spacing))
+        last_col = math.floor((x1 - tile_x_offset) / tile_x_spacing)
+        first_row = max(0, math.ceil((y0 - tile_y_offset - btn_height) / tile_y_spacing))
+        last_row = math.floor((y1 - tile_y_offset) / tile_y_spacing)
+        visible = set()
+        by_position = tree.by_position
+        if len(by_position) < (last_col - first_col + 1) * (last_row - first_row + 1):
+            # Sparse tree: cheaper to scan the talents than the empty grid cells
+            for (x, y), talent in by_position.items():
+                if first_col <= x <= last_col and first_row <= y <= last_row:
+                    visible.add(talent.id)
+        else:
+            for x in range(first_col, last_col + 1):
+                for y in range(first_row, last_row + 1):
+                    talent = by_position.get((x, y))
+                    if talent is not None:
+                        visible.add(talent.id)
+        # The root tile is off-grid
+        root = by_position.get((-1, -1))
+        if root is not None:
+            px, py, width, height, _ = self._tile_layout(root)
+            if px < x1 and px + width > x0 and py < y1 and py + height > y0:
+                visible.add(root.id)
+        return visible
+
+
+    def _update_viewport(self, tree_name):
+        # Create tiles/lines that scrolled into view and destroy those that left it
+        canvas = self.tab_frames[tree_name].canvas
+        canvas.pending = None
+        tree = self.model.tree(tree_name)
+        # Visible area in layout coordinates
+        zoom = canvas.zoom
+        x0 = canvas.canvasx(0) / zoom - viewport_margin
+        y0 = canvas.canvasy(0) / zoom - viewport_margin
+        x1 = canvas.canvasx(canvas.winfo_width()) / zoom + viewport_margin
+        y1 = canvas.canvasy(canvas.winfo_height()) / zoom + viewport_margin
+        visible = self._visible_talents(tree, x0, y0, x1, y1)
+
+        buttons = self.talent_buttons[tree_name]
+        for talent_id in [t for t in buttons if t not in visible]:
+            btn, _ = buttons.pop(talent_id)
+            self.tile_pool.release(btn)
+        for talent_id in visible:
+            if talent_id not in buttons:
+                self.create_tile(tree_name, canvas, tree.talents[talent_id])
+
+        # Lines with at least one end near the view
+        wanted = {edge for talent_id in visible for edge in self._tile_edges(tree.talents[talent_id])}
+        for edge in [e for e in canvas.lines if e not in wanted]:
+            canvas.delete(canvas.lines.pop(edge))
+        for edge in wanted:
+            if edge not in canvas.lines:
+                self.draw_line(tree_name, canvas, *edge)
+        if profiling.enabled:
+            profiling.sample(f"materialised tiles[{tree_name}]", len(buttons))
+
+
+    def _place_tile(self, canvas, btn, px, py):
+        # (px, py) are layout coordinates; the canvas zoom maps them to canvas pixels
+        zoom = canvas.zoom
+        btn.set_zoom(zoom)
+        if isinstance(btn, CanvasTile):
+            btn.place(x=px * zoom, y=py * zoom)
+            return
+        # Widget tiles are window items so they scroll, pan and zoom with the canvas
+        if btn.window_item is None:
+            btn.window_item = canvas.create_window(px * zoom, py * zoom, window=btn, anchor="nw")
+        else:
+            canvas.coords(btn.window_item, px * zoom, py * zoom)
+
+
+    def _tile_layout(self, talent):
+        """Return (x, y, width, height, xp_text) for a talent's tile."""
+        px, py, width, height = tile_layout.tile_rect(talent.position)
+        # The root tile has no XP cost
+        xp_text = "" if talent.is_root else f"{self.xp.rules.tier_cost(talent.position[0])} XP"
+        return px, py, width, height, xp_text
+
+
+    def create_tile(self, tree_name, canvas, talent):
+        px, py, width, height, btn_xp = self._tile_layout(talent)
+        key = (tree_name, talent.id)
+        color = self.colors.intended(key)
+        # Position is read at click time so moved tiles report their new column/row
+        btn = self.tile_pool.acquire(self.tile_cls, canvas, width, height, text=talent.name, textbox_text=talent.description,
+                                     xp_text=btn_xp, fg_color=color,
+                                     command=lambda t=talent: self.on_talent_click(tree_name, t.id, *t.position),
+                                     on_hover=lambda entered, t=talent: self.on_talent_hover(tree_name, t.id, entered))
+        self._place_tile(canvas, btn, px, py)
+        self.talent_buttons[tree_name][talent.id] = (btn, (px, py))
+        self._cache_anchor(tree_name, talent.id, px, py)
+        self.colors.painted_as(key, color)
+        return btn
+
+
+    def move_tile(self, tree_name, talent_id):
+        # Re-place a tile after its position changed and re-route only its lines
+        talent = self.model.talent(tree_name, talent_id)
+        px, py, width, height, btn_xp = self._tile_layout(talent)
+        canvas = self.tab_frames[tree_name].canvas
+        entry = self.talent_buttons[tree_name].get(talent_id)
+        if entry is None:
+            # Not materialised (virtual mode): the viewport refresh creates it if now in view
+            self._cache_anchor(tree_name, talent_id, px, py)
+            self._schedule_viewport(tree_name)
+        elif (entry[1][0] == initial_tile_posx) != (px == initial_tile_posx):
+            # Moved to/from the root slot, which uses a different tile size
+            self.tile_pool.release(entry[0])
+            self.create_tile(tree_name, canvas, talent)
+        else:
+            btn = entry[0]
+            self._place_tile(canvas, btn, px, py)
+            btn.configure(xp_text=btn_xp)
+            self.talent_buttons[tree_name][talent_id] = (btn, (px, py))
+            self._cache_anchor(tree_name, talent_id, px, py)
+
+        for from_id, to_id in self._tile_edges(talent):
+            line_id = canvas.lines.get((from_id, to_id))
+            if line_id is not None:
+                canvas.coords(line_id, *self._line_coords(tree_name, canvas, from_id, to_id))
+
+
+    def _tile_edges(self, talent):
+        for to_id in talent.out:
+            yield talent.id, to_id
+        for from_id in talent.inc:
+            yield from_id, talent.id
+
+
+    def _cache_anchor(self, tree_name, talent_id, px, py):
+        offset_x, offset_y = self._get_line_offsets(px, initial_tile_posx, btn_width, btn_height)
+        self.tile_anchors[tree_name][talent_id] = (px + offset_x, py + offset_y)
 
 
     def build_tabs(self):
-        for i, tree in enumerate(self.data["trees"]):
-            tab = self.tabs.add(tree["name"])
-            print(f"Building tab: {tree["name"]}")
-            tab.tree_index = i # For getting the tree data later
-            tab.canvas_lines = []
-            self.populate_tab(tab, tree)
+        for tree in self.model.trees:
+            self.tabs.add(tree.name)
+            if not self.lazy_tabs:
+                self.build_tab(tree.name)
+
+        # Lazy mode: only the visible tab is built now, the rest on first view
+        if self.lazy_tabs and self.model.trees:
+            self.build_tab(self.tabs.get())
+            if self.prebuild_tabs:
+                self.after_idle(self._prebuild_next_tab)
+
+
+    def build_tab(self, tree_name):
+        # Build a tab's canvas, tiles and lines once; later calls are no-ops
+        if tree_name in self.tab_frames:
+            return
+        if not self.ensure_tree(tree_name):
+            return
+        self.populate_tab(self.tabs.tab(tree_name), self.model.tree(tree_name))
+
+
+    def ensure_tree(self, tree_name):
+        # Sharded data: read the tree's file on first use. Returns False if it can't be loaded
+        try:
+            if self.model.ensure_tree(tree_name):
+                self.search.add_tree(self.model.tree(tree_name))
+        except (OSError, ValueError) as e:
+            print(f"Failed to load tree {tree_name}:", e)
+            return False
+        return True
+
+
+    def on_tab_change(self):
+        self.build_tab(self.tabs.get())
+
+
+    def _prebuild_next_tab(self):
+        # Build one unbuilt tab per idle callback so the UI stays responsive
+        for tree in self.model.trees:
+            if tree.name not in self.tab_frames:
+                self.build_tab(tree.name)
+                self.after_idle(self._prebuild_next_tab)
+                return
 
 
     def _get_line_offsets(self, x_pos, initial_x, btn_width, btn_height):
         """Helper function to calculate offsets based on x-position."""
-        # Exception for initial tree tile
-        if x_pos == initial_x:
-            offset_x = btn_width * 0
-            offset_y = btn_height * 1.35
-        else:
-            offset_x = btn_width / 2
-            offset_y = btn_height / 1.5
-        return offset_x, offset_y
+        return tile_layout.line_offsets(x_pos, initial_x, btn_width, btn_height)
 
 
     def draw_connections(self, tree, canvas):
-        for talent in tree["talents"]:
-                sx, sy = self.talent_buttons[tree["name"]][talent["id"]][1]
-                for conn_id in talent["connections"]:
-                    ex, ey = self.talent_buttons[tree["name"]][conn_id][1]
-                    s_offsetx, s_offsety = self._get_line_offsets(sx, initial_tile_posx, btn_width, btn_height)
-                    e_offsetx, e_offsety = self._get_line_offsets(ex, initial_tile_posx, btn_width, btn_height)
-                    
-                    line_id = canvas.create_line(sx + s_offsetx, sy + s_offsety, ex + e_offsetx, ey + e_offsety, fill="#76d8ff", width=2)
-                    canvas.lines.append(line_id)
+        for from_id, to_id in tree.edges():
+            self.draw_line(tree.name, canvas, from_id, to_id)
+
+
+    def draw_line(self, tree_name, canvas, from_id, to_id):
+        line_id = canvas.create_line(*self._line_coords(tree_name, canvas, from_id, to_id), fill=line_clr,
+                                     width=max(1, round(2 * canvas.zoom)), tags="line")
+        canvas.tag_lower(line_id)  # keep lines under canvas-drawn tiles
+        canvas.lines[(from_id, to_id)] = line_id
+        return line_id
 
 
     def modify_connection(self, tree_name, from_id, to_id):
-        tree = next(t for t in self.data["trees"] if t["name"] == tree_name)
-        from_talent = next(t for t in tree["talents"] if t["id"] == from_id)
-        to_talent = next(t for t in tree["talents"] if t["id"] == to_id)
-        if to_id in from_talent["connections"]:
-            from_talent["connections"].remove(to_id)
-        elif from_id in to_talent["connections"]:
-            to_talent["connections"].remove(from_id)
-        else:
-            from_talent["connections"].append(to_id)
+        record = self.model.connection_edit(tree_name, from_id, to_id)
+        self.edit(record)
+        return record[2:]
 
     def modify_position(self, tree_name, from_id, to_id):
-        tree = next(t for t in self.data["trees"] if t["name"] == tree_name)
-        from_talent = next(t for t in tree["talents"] if t["id"] == from_id)
-        to_talent = next(t for t in tree["talents"] if t["id"] == to_id)
-
-        # copy and swap the position values
-        from_pos = list(from_talent["position"])
-        to_pos = list(to_talent["position"])
-        from_talent["position"], to_talent["position"] = to_pos, from_pos
+        self.edit(self.model.swap_edit(tree_name, from_id, to_id))
+
+
+    #==== Edit records / undo ====
+    def edit(self, record):
+        # All tree edits go through here so they're saved, undoable and drawn incrementally
+        self.history.push(record)
+        self.apply_edit(record)
+
+    def _tree_shortcut(self, action):
+        # Root bindings also fire for the search box and XP entry; keys typed there aren't tree edits
+        def handler(event):
+            if not isinstance(event.widget, (tk.Entry, tk.Text)):
+                action()
+        return handler
+
+    def undo(self, event=None):
+        record = self.history.undo()
+        if record is not None:
+            self.apply_edit(record)
+
+    def redo(self, event=None):
+        record = self.history.redo()
+        if record is not None:
+            self.apply_edit(record)
+
+    def apply_edit(self, record):
+        # Update the model, then patch only the affected lines/tiles of a built tab
+        self.model.apply_edit(record)
+        self.writer.record(record)
+        kind, tree_name = record[0], record[1]
+        built = tree_name in self.tab_frames
+        if kind in ("connect", "swap"):
+            self.paths.invalidate(tree_name)  # only this tree's prerequisites changed
+        if kind == "connect":
+            _, _, from_id, to_id, added = record
+            if built:
+                canvas = self.tab_frames[tree_name].canvas
+                if added and (from_id, to_id) not in canvas.lines:
+                    self.draw_line(tree_name, canvas, from_id, to_id)
+                elif not added and (from_id, to_id) in canvas.lines:
+                    canvas.delete(canvas.lines.pop((from_id, to_id)))
+        elif kind == "swap":
+            _, _, a_id, b_id, _, _ = record
+            self.xp.retier(tree_name, a_id)
+            self.xp.retier(tree_name, b_id)
+            self.update_xp_label()
+            if built:
+                self.move_tile(tree_name, a_id)
+                self.move_tile(tree_name, b_id)
+        elif kind == "text":
+            _, _, talent_id, _, _, new_name, new_desc = record
+            self.search.update(tree_name, talent_id, new_name, new_desc)
+            if built and talent_id in self.talent_buttons[tree_name]:
+                btn, _ = self.talent_buttons[tree_name][talent_id]
+                btn.configure(text=new_name, textbox_text=new_desc)
+
+
+    def save_data(self, filename=None):
+        # Without a filename, saves over the loaded data (only edited trees for sharded data);
+        # with one, exports everything as a single data.json-style file
+        file = Path(__file__).resolve().parent / filename if filename else None
+        # Written atomically on the writer thread; skipped when nothing changed
+        if not self.writer.save(self.model, file):
+            print("No changes to save")
+
+    def _autosave(self):
+        self.writer.autosave(self.model)
+        self.after(self.autosave_ms, self._autosave)
+
+    #==== Live reload ====
+    def _poll_reload(self):
+        result = self.watcher.poll()
+        if result is not None:
+            graph, error = result
+            if error is not None:
+                print("data.json changed but could not be loaded:", error)
+            else:
+                self.reload_data(graph)
+        self.after(self.watch_ms, self._poll_reload)
 
+    def reload_data(self, new):
+        """Make the model match a freshly loaded graph, redrawing only what changed.
 
-    def save_data(self, filename="data.json"):
-        here = Path(__file__).resolve().parent
-        file = here / filename
-        with open(file, "w") as f:
-            json.dump(self.data, f, indent=4)
-            
-    
-    # Clear the tab, then repopulate it with updated buttons (unused)
-    def reset_tab(self):
-            this_tab_name = self.tabs.get()
-            this_tab = self.tabs.tab(this_tab_name)
-            child_frame = this_tab.winfo_children()[0] # Assumes frame is the first child
-            child_frame.destroy()
+        Selected talents are kept where their ids still exist.
+        """
+        diff = data_watch.diff_graphs(self.model, new)
+        if not diff:
+            return
+        if self.writer.unjournalled:
+            print(f"data.json changed on disk; discarding {self.writer.unjournalled} unsaved edit(s)")
+        before = set(self.selected_talents)
+        data_watch.apply_diff(self.model, new, diff)
+        for tree_name in list(diff.trees) + diff.removed_trees:
+            self.paths.invalidate(tree_name)
+        # Undo records and edit buffers refer to the old data
+        self.history.clear()
+        self.writer.mark_reloaded()
+        self.connection_edit_buffer = None
+        self.pos_edit_buffer = None
+        self.colors.clear_layer("edit")
+
+        for tree_name in diff.removed_trees:
+            for key in [k for k in self.search.docs if k[0] == tree_name]:
+                self.search.remove(*key)
+            frame = self.tab_frames.pop(tree_name, None)
+            if frame is not None:
+                self.tile_pool.forget_canvas(frame.canvas)
+            self.talent_buttons.pop(tree_name, None)
+            self.tile_anchors.pop(tree_name, None)
+            tab = self.tabs.tab(tree_name)
+            self.tabs.delete(tree_name)  # only un-grids the tab frame
+            tab.destroy()
+        for tree_name in diff.added_trees:
+            tree = self.model.tree(tree_name)
+            self.search.add_tree(tree)
+            self.tabs.insert(tree.index, tree_name)
+            if not self.lazy_tabs or self.prebuild_tabs:
+                self.build_tab(tree_name)
+        for tree_name, tree_diff in diff.trees.items():
+            tree = self.model.tree(tree_name)
+            for talent_id in tree_diff.removed:
+                self.search.remove(tree_name, talent_id)
+            for talent_id in tree_diff.added + tree_diff.edited:
+                talent = tree.talents[talent_id]
+                self.search.update(tree_name, talent_id, talent.name, talent.description)
+            if tree_name in self.tab_frames:
+                self._patch_tab(tree, tree_diff)
+
+        # Re-cost the surviving selection (moved talents may have changed tier)
+        self.xp.load(before)
+        self.update_xp_label()
+        self.colors.invalidate(*(before ^ self.selected_talents))
+        self.mark_search_hits()
+        self.build_tab(self.tabs.get())
+
+    def _patch_tab(self, tree, tree_diff):
+        # Apply one tree's diff to its built tab: only the changed tiles and lines
+        canvas = self.tab_frames[tree.name].canvas
+        buttons = self.talent_buttons[tree.name]
+        for edge in tree_diff.disconnected:
+            line_id = canvas.lines.pop(edge, None)
+            if line_id is not None:
+                canvas.delete(line_id)
+        for talent_id in tree_diff.removed:
+            self.tile_anchors[tree.name].pop(talent_id, None)
+            entry = buttons.pop(talent_id, None)
+            if entry is not None:
+                self.tile_pool.release(entry[0])
+        if not canvas.virtual:
+            for talent_id in tree_diff.added:
+                self.create_tile(tree.name, canvas, tree.talents[talent_id])
+        for talent_id in tree_diff.edited:
+            if talent_id in buttons:
+                talent = tree.talents[talent_id]
+                buttons[talent_id][0].configure(text=talent.name, textbox_text=talent.description)
+        for talent_id in tree_diff.moved:
+            self.move_tile(tree.name, talent_id)
+        for edge in tree_diff.connected:
+            if edge not in canvas.lines and not canvas.virtual:
+                self.draw_line(tree.name, canvas, *edge)
+        if canvas.virtual:
+            # Extent may have changed; the viewport refresh adds new tiles and lines in view
+            self._layout_virtual_tab(tree, canvas)
+        else:
+            self._update_scrollregion(tree, canvas)
+
+    def on_close(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.writer.close(self.model)
+        if profiling.enabled:
+            self._sample_widgets("exit")
+        self.destroy()
+
+    def _sample_widgets(self, when):
+        profiling.sample(f"widgets at {when}", self.count_widgets())
+        profiling.sample(f"tiles at {when}", sum(len(t) for t in self.talent_buttons.values()))
+        profiling.sample(f"canvas items at {when}", sum(len(f.canvas.find_all()) for f in self.tab_frames.values()))
+        for name, value in self.tile_pool.stats().items():
+            profiling.sample(f"tile pool {name} at {when}", value)
+
+    def count_widgets(self, widget=None):
+        widget = widget or self
+        return 1 + sum(self.count_widgets(child) for child in widget.winfo_children())
             
-            tree_data = self.data["trees"][this_tab.tree_index]
-            self.populate_tab(this_tab, tree_data)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Talent Tree Builder")
+    parser.add_argument("--renderer", choices=sorted(tile_renderers), default="widget",
+                        help="draw tiles as CTk widgets or directly on the tree canvas")
+    parser.add_argument("--journal", action="store_true",
+                        help="autosave edits to data.json.journal between full saves")
+    parser.add_argument("--data", default="data.json",
+                        help="data.json-style file, or a sharded directory made with data_shards.py")
+    parser.add_argument("--no-watch", action="store_true",
+                        help="don't reload data.json when it changes on disk")
+    parser.add_argument("--virtual", action="store_true",
+                        help="only create the tiles near the visible part of each tree (for very large trees)")
+    parser.add_argument("--profile", nargs="?", const="profile.json", metavar="REPORT",
+                        help=f"time startup and interactions, report at exit (also ${profiling.ENV_VAR})")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable(args.profile)
+    else:
+        profiling.enable_from_env()
+    profiling.instrument(TalentTreeApp, {
+        "populate_tab": lambda self, tab, tree: tree.name,
+        "draw_connections": lambda self, tree, canvas: tree.name,
+        "on_talent_click": None,
+        "on_talent_hover": None,
+        "apply_edit": lambda self, record: record[0],
+        "load_character": None,
+        "suggest_build": None,
+        "on_search": None,
+        "reload_data": None,
+    })
+    profiling.instrument(TileColorScheduler, {"flush": "recolour flush"})
+
     ctk.set_appearance_mode("System")
     ctk.set_default_color_theme("blue")
-    app = TalentTreeApp(loadData())
+    with profiling.span("loadData"):
+        data = loadData(args.data)
+    with profiling.span("app startup"):
+        app = TalentTreeApp(data, renderer=args.renderer, journal=args.journal, virtual=args.virtual,
+                            data_path=Path(__file__).resolve().parent / args.data, watch=not args.no_watch)
+        app.update_idletasks()
     app.mainloop()
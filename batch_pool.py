@@ -0,0 +1,42 @@
+"""Shared setup for the headless batch tools (check_characters, export_trees).
+
+Both load the talent data once, then fan work out to a process pool whose
+workers each rebuild the model from a compact copy. Nothing here imports
+tkinter.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import data_cache
+from talent_model import TalentGraph
+from xp_engine import DEFAULT_TIER_XP_VALUES, DEFAULT_TREE_XP_COST, XPRules
+
+# The worker process's model, set by _init_worker
+graph = None
+rules = None
+
+
+def _init_worker(compact, tier_xp_values, tree_xp_cost):
+    # Each worker builds the model once from the parent's compact copy
+    global graph, rules
+    graph = TalentGraph.from_compact(compact)
+    rules = XPRules(tier_xp_values, tree_xp_cost)
+
+
+def add_arguments(parser):
+    """Add --data, --tier-xp, --tree-xp-cost and --workers to an argparse parser."""
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.json"))
+    parser.add_argument("--tier-xp", type=int, nargs="+", default=list(DEFAULT_TIER_XP_VALUES), help="XP cost per tier")
+    parser.add_argument("--tree-xp-cost", type=int, default=DEFAULT_TREE_XP_COST, help="surcharge per tree beyond the second")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+
+
+def load(args):
+    """(graph, rules) for parsed add_arguments() options."""
+    return data_cache.load_graph(args.data, tier_count=len(args.tier_xp)), XPRules(args.tier_xp, args.tree_xp_cost)
+
+
+def worker_pool(args, graph):
+    """A process pool whose workers hold graph and the rules from args (as batch_pool.graph/rules)."""
+    init = (graph.to_compact(), args.tier_xp, args.tree_xp_cost)
+    return ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=init)
@@ -0,0 +1,149 @@
+"""Benchmark the builder's hot paths on synthetic datasets.
+
+Run from the repo root. A virtual X display (Xvfb) is started when there is
+no DISPLAY:
+
+    python -m benchmarks.bench_app                       # default sizes
+    python -m benchmarks.bench_app --sizes 9x31x6 20x300x12
+    python -m benchmarks.bench_app --save-baseline       # record benchmarks/baseline.json
+    python -m benchmarks.bench_app --tolerance 0.25      # compare against it
+    python -m benchmarks.bench_app --virtual             # virtualised tabs
+
+Sizes are TREESxTALENTSxCOLUMNS. Each size runs in a fresh interpreter and
+measures: building every tab, redrawing one tree's lines, a click, loading
+a character and saving the data, plus RSS after build and peak RSS.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks import harness
+from benchmarks.synthetic import make_dataset, tier_values
+
+DEFAULT_SIZES = ["9x31x6", "9x120x8", "20x300x12"]
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+TIME_METRICS = ("build_ms", "redraw_ms", "click_ms", "load_ms", "save_ms")
+
+
+def parse_size(size):
+    trees, talents, columns = (int(v) for v in size.split("x"))
+    return trees, talents, columns
+
+
+def run_size(size, density=0.3, clicks=200, seed=0, virtual=False):
+    harness.ensure_display()
+    import Builderv2
+    from xp_engine import XPRules
+
+    trees, talents, columns = parse_size(size)
+    data = make_dataset(trees, talents, columns, density, seed)
+    rng = random.Random(seed)
+    result = {}
+
+    base_rss = harness.rss_kb()
+    app = None
+
+    def build():
+        nonlocal app
+        app = Builderv2.TalentTreeApp(data, lazy_tabs=False, xp_rules=XPRules(tier_values(columns)), virtual=virtual)
+        app.update()
+    result["build_ms"] = harness.timed(build)
+    result["rss_build_mb"] = (harness.rss_kb() - base_rss) / 1024
+
+    tree = app.model.trees[0]
+    canvas = app.tab_frames[tree.name].canvas
+
+    def redraw():
+        for line in canvas.lines.values():
+            canvas.delete(line)
+        canvas.lines.clear()
+        app.draw_connections(tree, canvas)
+        app.update_idletasks()
+    result["redraw_ms"] = harness.timed(redraw, repeat=5)
+
+    keys = [(t.tree, t.id) for tr in app.model.trees for t in tr]
+    picks = [rng.choice(keys) for _ in range(clicks)]
+    it = iter(picks)
+
+    def click():
+        tree_name, talent_id = next(it)
+        app.on_talent_click(tree_name, talent_id, *app.model.talent(tree_name, talent_id).position)
+        app.colors.flush()
+        app.update_idletasks()
+    result["click_ms"] = harness.timed(click, repeat=clicks)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        char_path = os.path.join(tmp, "character.json")
+        selection = rng.sample(keys, min(60, len(keys)))
+        with open(char_path, "w", encoding="utf-8") as f:
+            json.dump({"selected_talents": [list(k) for k in selection], "xp_total": 60, "xp_spent": 0}, f)
+
+        def load():
+            app.load_character(char_path)
+            app.colors.flush()
+            app.update_idletasks()
+        result["load_ms"] = harness.timed(load, repeat=5)
+
+        save_path = os.path.join(tmp, "data.json")
+
+        def save():
+            app.writer.save(app.model, save_path)
+            app.writer.wait()
+        result["save_ms"] = harness.timed(save, repeat=5)
+
+    result["peak_rss_mb"] = harness.peak_rss_kb() / 1024
+    app.on_close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="TREESxTALENTSxCOLUMNS")
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--virtual", action="store_true", help="build the app with virtualised tabs")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_size(args.child, args.density, virtual=args.virtual)))
+        return
+
+    harness.ensure_display()
+    results = {}
+    print(f"{'size':<12}{'build ms':>10}{'redraw ms':>11}{'click ms':>10}{'load ms':>9}{'save ms':>9}{'RSS MB':>8}{'peak MB':>9}")
+    for size in args.sizes:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_app", "--child", size, "--density", str(args.density)]
+                             + (["--virtual"] if args.virtual else []),
+                             capture_output=True, text=True, check=True).stdout
+        r = results[size] = json.loads(out.strip().splitlines()[-1])
+        print(f"{size:<12}{r['build_ms']:>10.1f}{r['redraw_ms']:>11.2f}{r['click_ms']:>10.2f}{r['load_ms']:>9.2f}"
+              f"{r['save_ms']:>9.2f}{r['rss_build_mb']:>8.1f}{r['peak_rss_mb']:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = harness.compare(results, json.load(f), args.tolerance, TIME_METRICS)
+        if regressions:
+            print("Regressions vs baseline:")
+            print("\n".join("  " + line for line in regressions))
+            sys.exit(1)
+        print("No regressions vs baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare tile renderers: construction time and RSS for one large tree.
+
+Run from the repo root (Xvfb is started if there's no display):
+
+    python -m benchmarks.bench_renderers --sizes 300 3000
+    python -m benchmarks.bench_renderers --markdown   # table for the README
+
+Each (renderer, size) pair runs in a fresh interpreter so RSS figures
+aren't polluted by earlier runs.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks import harness
+from benchmarks.synthetic import make_dataset
+
+
+def run_one(renderer, size):
+    harness.ensure_display()
+    import Builderv2
+    data = make_dataset(trees=1, talents=size, columns=6)
+    base = harness.rss_kb()
+    start = time.perf_counter()
+    app = Builderv2.TalentTreeApp(data, renderer=renderer)
+    app.update_idletasks()
+    build_s = time.perf_counter() - start
+    result = {"renderer": renderer, "tiles": size, "build_s": round(build_s, 4), "rss_delta_kb": harness.rss_kb() - base,
+              "display": f"{os.environ.get('DISPLAY', 'native')} ({app.winfo_server()}, "
+                         f"{app.winfo_screenwidth()}x{app.winfo_screenheight()}x{app.winfo_screendepth()})"}
+    app.on_close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 3000])
+    parser.add_argument("--renderers", nargs="+", default=["widget", "canvas"])
+    parser.add_argument("--markdown", action="store_true", help="print the results as a Markdown table")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child[0], int(args.child[1]))))
+        return
+
+    harness.ensure_display()
+    if args.markdown:
+        print("| Renderer | Tiles | Build (s) | RSS growth (MB) |")
+        print("|---|---:|---:|---:|")
+    else:
+        print(f"{'renderer':<10}{'tiles':>8}{'build (s)':>12}{'RSS (MB)':>12}")
+    display = None
+    for size in args.sizes:
+        for renderer in args.renderers:
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_renderers", "--child", renderer, str(size)],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            display = r["display"]
+            if args.markdown:
+                print(f"| {r['renderer']} | {r['tiles']} | {r['build_s']:.3f} | {r['rss_delta_kb'] / 1024:.1f} |")
+            else:
+                print(f"{r['renderer']:<10}{r['tiles']:>8}{r['build_s']:>12.3f}{r['rss_delta_kb'] / 1024:>12.1f}")
+    print()
+    print(f"Machine: {harness.machine_details()}")
+    print(f"Display: {display}")
+
+
+if __name__ == "__main__":
+    main()
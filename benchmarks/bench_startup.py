@@ -0,0 +1,55 @@
+"""Cold vs warm data loading: plain json.load vs the compiled data cache.
+
+    python -m benchmarks.bench_startup [--data data.json] [--repeat 50]
+
+cold  = parse JSON, build the model, validate and write the cache
+warm  = load the model from a fresh cache
+json  = the old json.load + model build, without validation
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+import data_cache
+from benchmarks import harness
+from talent_model import TalentGraph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data.json")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "data.json")
+        shutil.copy(args.data, path)
+        cache = data_cache.cache_path(path)
+
+        def json_load():
+            with open(path, "r", encoding="utf-8") as f:
+                TalentGraph.from_dict(json.load(f))
+
+        def cold():
+            if cache.exists():
+                cache.unlink()
+            data_cache.load_graph(path)
+
+        def warm():
+            data_cache.load_graph(path)
+
+        results = {"json": harness.timed(json_load, args.repeat), "cold": harness.timed(cold, args.repeat)}
+        data_cache.load_graph(path)
+        results["warm"] = harness.timed(warm, args.repeat)
+        print(f"{os.path.getsize(args.data) / 1024:.0f} KB source, {cache.stat().st_size / 1024:.0f} KB cache")
+        for name, ms in results.items():
+            print(f"{name:<6}{ms:8.3f} ms")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Shared helpers for the GUI benchmarks: virtual display, timing, memory, baselines."""
+import atexit
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+
+def ensure_display():
+    """Make sure Tk has a display, starting Xvfb on a headless Linux box if needed."""
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise SystemExit("No display available: install Xvfb or run under xvfb-run")
+    read_fd, write_fd = os.pipe()
+    proc = subprocess.Popen([xvfb, "-displayfd", str(write_fd), "-screen", "0", "1920x1200x24", "-nolisten", "tcp"],
+                            pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        display = f.readline().strip()
+    if not display:
+        proc.kill()
+        raise SystemExit("Xvfb failed to start")
+    os.environ["DISPLAY"] = f":{display}"
+    atexit.register(proc.terminate)
+
+
+def machine_details():
+    """OS, CPU and Python/Tk versions, for labelling published figures."""
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    import tkinter
+    return (f"{platform.system()} {platform.release()}, {cpu} ({os.cpu_count()} CPUs), "
+            f"Python {platform.python_version()}, Tk {tkinter.TkVersion}")
+
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def peak_rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def timed(fn, repeat=1):
+    """Median wall time of fn() over repeat runs, in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def compare(results, baseline, tolerance=0.2, metrics=None):
+    """Lines describing metrics that got worse than baseline by more than tolerance."""
+    regressions = []
+    for label, row in results.items():
+        base = baseline.get(label)
+        if not base:
+            continue
+        for metric, value in row.items():
+            if metrics and metric not in metrics:
+                continue
+            old = base.get(metric)
+            if isinstance(old, (int, float)) and old > 0 and value > old * (1 + tolerance):
+                regressions.append(f"{label} {metric}: {old:.3f} -> {value:.3f} (+{(value / old - 1) * 100:.0f}%)")
+    return regressions
@@ -0,0 +1,75 @@
+"""Synthetic talent datasets in the data.json schema.
+
+    python -m benchmarks.synthetic --trees 9 --talents 31 --columns 6 --density 0.3 -o synthetic.json
+
+Each tree gets a root tile at (-1, -1) plus talents laid out column by
+column; edges join talents in neighbouring columns with probability
+``density`` (plus a few root -> tier 0 links), so prerequisites look like
+the hand-made trees.
+"""
+import argparse
+import json
+import random
+
+
+def make_tree(name, talents, columns=6, density=0.3, rng=None, prefix=None):
+    rng = rng or random.Random(0)
+    prefix = prefix or name[:2].lower()
+    rows = max(1, -(-(talents - 1) // columns))  # ceil, root excluded
+    tiles = []
+    grid = {}
+    for i in range(talents - 1):
+        x, y = i // rows, i % rows
+        tid = f"{prefix}{i}"
+        grid[(x, y)] = tid
+        tiles.append({"id": tid, "name": f"{name.upper()} TALENT {i}",
+                      "description": f"Synthetic talent {i} of {name}. " + " ".join(rng.choice(_WORDS) for _ in range(18)),
+                      "position": [x, y], "connections": []})
+    by_id = {t["id"]: t for t in tiles}
+    for (x, y), tid in grid.items():
+        for dy in (-1, 0, 1):
+            target = grid.get((x + 1, y + dy))
+            if target and rng.random() < density:
+                by_id[tid]["connections"].append(target)
+    root = {"id": f"{prefix}{talents - 1}", "name": name.upper(), "description": f"Root talent of {name}.",
+            "position": [-1, -1], "connections": [grid[(0, y)] for y in range(rows) if (0, y) in grid and rng.random() < density]}
+    return {"name": name, "talents": tiles + [root]}
+
+
+def make_dataset(trees=9, talents=31, columns=6, density=0.3, seed=0):
+    """A dataset of `trees` trees with `talents` talents each (including the root)."""
+    rng = random.Random(seed)
+    return {"trees": [make_tree(f"Tree{t}", talents, columns, density, rng, prefix=f"t{t}_") for t in range(trees)]}
+
+
+def tier_values(columns):
+    # Tier costs for any column count, extending the shipped 4, 6, 8, 8, 10, 10 pattern
+    base = [4, 6, 8, 8, 10, 10]
+    return (base + [10 + 2 * ((i - 4) // 2) for i in range(len(base), columns)])[:columns]
+
+
+_WORDS = ("omen", "joker", "card", "flip", "ally", "enemy", "session", "skill", "attack", "move",
+          "discard", "draw", "focus", "shape", "heal", "spell", "range", "turn", "free", "bonus")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trees", type=int, default=9)
+    parser.add_argument("--talents", type=int, default=31, help="talents per tree, including the root")
+    parser.add_argument("--columns", type=int, default=6, help="tier columns")
+    parser.add_argument("--density", type=float, default=0.3, help="chance of an edge between neighbouring-column talents")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="-")
+    args = parser.parse_args()
+
+    data = make_dataset(args.trees, args.talents, args.columns, args.density, args.seed)
+    text = json.dumps(data, indent=4)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Headless optimal-build solver.
+
+Finds the selection of talents with the highest total weight that fits an XP
+budget, using the same rules as the XP engine (tier costs plus a surcharge for
+each tree beyond the free ones) and honouring connection prerequisites (see
+Tree.prerequisites): a talent can only be taken if one of its lower-column
+neighbours is taken too.
+
+Each tree is solved for every budget from 0 to the limit in one pass over its
+talents in column order, keeping the best weight per (prerequisites still
+needed later, XP spent) state and dropping states that cost more for no more
+weight. A state cap bounds the work on huge or densely connected trees. Trees
+are independent so they can be solved in a process pool. A second DP then picks
+how much budget each tree gets.
+
+    python build_solver.py --xp 60 --must Shaper:h3 --weights weights.json
+"""
+import argparse
+import heapq
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import batch_pool
+from xp_engine import XPRules
+
+DEFAULT_MAX_STATES = 4000  # live DP states per row before the solver starts dropping the weakest
+
+
+class Build:
+    __slots__ = ("talents", "xp_spent", "weight", "exact")
+
+    def __init__(self, talents, xp_spent, weight, exact=True):
+        self.talents = talents      # [(tree_name, talent_id)]
+        self.xp_spent = xp_spent
+        self.weight = weight
+        self.exact = exact          # False if the state cap cut the search short
+
+    def __repr__(self):
+        return f"Build({len(self.talents)} talents, xp_spent={self.xp_spent}, weight={self.weight}, exact={self.exact})"
+
+
+def tree_problem(tree, rules, weights=None, must_have=(), default_weight=1):
+    """Flatten one tree into picklable (id, cost, weight, prereq indexes, must) rows.
+
+    Rows are in column order, so every prerequisite comes before the talents it unlocks.
+    Unweighted roots and placeholder ("Blank") talents score 0.
+    """
+    weights = weights or {}
+    order = sorted(tree, key=lambda t: t.position)
+    index = {t.id: i for i, t in enumerate(order)}
+    rows = []
+    for t in order:
+        key = (tree.name, t.id)
+        weight = weights.get(key, 0 if t.is_root or t.is_placeholder else default_weight)
+        prereqs = tuple(sorted(index[p] for p in tree.prerequisites(t.id)))
+        rows.append((t.id, rules.talent_cost(t), weight, prereqs, key in must_have))
+    return rows
+
+
+def solve_tree(rows, budget, max_states=DEFAULT_MAX_STATES):
+    """Best (weight, cost, ids) for one tree at every budget 0..budget (None if infeasible).
+
+    Returns (table, exact). When a row has more than max_states live states
+    the lowest-weight ones are dropped and exact is False.
+    """
+    n = len(rows)
+    # Last row that needs each talent as a prerequisite; past it, it can leave the state
+    last_use = [-1] * n
+    for i, row in enumerate(rows):
+        for p in row[3]:
+            last_use[p] = max(last_use[p], i)
+    # {(frontier bitmask of taken talents still needed, xp spent): (weight, picks)}
+    # picks is a (talent_id, rest) chain so extending it is O(1)
+    states = {(0, 0): (0, None)}
+    exact = True
+    for i, (talent_id, cost, weight, prereqs, must) in enumerate(rows):
+        prereq_mask = sum(1 << p for p in prereqs)
+        bit = 1 << i if last_use[i] > i else 0
+        # Frontier bits whose last use is row i drop out after it
+        done = sum(1 << p for p in prereqs if last_use[p] == i)
+        next_states = {}
+        for (frontier, spent), (w, picks) in states.items():
+            carry = frontier & ~done
+            if not must:
+                key = (carry, spent)
+                old = next_states.get(key)
+                if old is None or w > old[0]:
+                    next_states[key] = (w, picks)
+            if spent + cost <= budget and (not prereqs or frontier & prereq_mask):
+                key = (carry | bit, spent + cost)
+                old = next_states.get(key)
+                if old is None or w + weight > old[0]:
+                    next_states[key] = (w + weight, (talent_id, picks))
+        states = _prune(next_states)
+        if len(states) > max_states:
+            exact = False
+            kept = heapq.nlargest(max_states, states.items(), key=lambda s: (s[1][0], -s[0][1]))
+            states = dict(kept)
+        if not states:
+            break
+
+    # Best finished state per exact spend, then the best at or under each budget
+    by_spent = {}
+    for (_, spent), (w, picks) in states.items():
+        old = by_spent.get(spent)
+        if old is None or w > old[0]:
+            by_spent[spent] = (w, picks)
+    table = []
+    best = None
+    for b in range(budget + 1):
+        entry = by_spent.get(b)
+        # Prefer more weight, then less XP
+        if entry is not None and (best is None or entry[0] > best[0]):
+            best = (entry[0], b, _unchain(entry[1]))
+        table.append(best)
+    return table, exact
+
+
+def _prune(states):
+    # For each frontier, drop states that spend more XP for no more weight
+    by_frontier = {}
+    for (frontier, spent), value in states.items():
+        by_frontier.setdefault(frontier, []).append((spent, value))
+    kept = {}
+    for frontier, entries in by_frontier.items():
+        entries.sort(key=lambda e: e[0])
+        top = None
+        for spent, value in entries:
+            if top is None or value[0] > top:
+                kept[(frontier, spent)] = value
+                top = value[0]
+    return kept
+
+
+def _unchain(picks):
+    ids = []
+    while picks is not None:
+        ids.append(picks[0])
+        picks = picks[1]
+    ids.reverse()
+    return tuple(ids)
+
+
+def _solve_tree_job(args):
+    return solve_tree(*args)
+
+
+def check_selection(graph, selection, rules=None):
+    """(xp, missing) for a selection the solver must keep.
+
+    xp is what the selection costs on its own; missing lists the selected
+    (tree_name, talent_id) whose prerequisites are all unselected. The solver
+    fails when xp is over budget, or when there isn't enough XP left to add
+    the missing prerequisites.
+    """
+    rules = rules or XPRules()
+    selection = set(selection)
+    tier_xp = 0
+    missing = []
+    for tree_name, talent_id in selection:
+        tree = graph.tree(tree_name)
+        tier_xp += rules.talent_cost(tree.talent(talent_id))
+        prereqs = tree.prerequisites(talent_id)
+        if prereqs and not any((tree_name, p) in selection for p in prereqs):
+            missing.append((tree_name, talent_id))
+    xp = tier_xp + rules.tree_surcharge(len({tree_name for tree_name, _ in selection}))
+    return xp, sorted(missing)
+
+
+def suggest_build(graph, budget, rules=None, weights=None, must_have=(), default_weight=1, workers=None,
+                  max_states=DEFAULT_MAX_STATES):
+    """Return the best Build within budget XP, or None if the must-haves can't be met.
+
+    weights maps (tree_name, talent_id) to a score (unlisted talents score
+    default_weight, roots and placeholders 0). must_have is an iterable of (tree_name, talent_id).
+    workers > 1 solves trees in a process pool. max_states caps each tree's
+    search (see solve_tree); Build.exact says whether it was reached.
+    """
+    rules = rules or XPRules()
+    problems = build_problems(graph, rules, weights, must_have, default_weight)
+    return solve_problems(problems, budget, rules, workers, max_states)
+
+
+def build_problems(graph, rules=None, weights=None, must_have=(), default_weight=1):
+    """[(tree_name, rows)] for every tree: a snapshot of graph that solve_problems can use on another thread."""
+    rules = rules or XPRules()
+    must_have = set(must_have)
+    for tree_name, talent_id in must_have:
+        graph.talent(tree_name, talent_id)  # KeyError for unknown talents
+    return [(tree.name, tree_problem(tree, rules, weights, must_have, default_weight)) for tree in graph.trees]
+
+
+def solve_problems(problems, budget, rules=None, workers=None, max_states=DEFAULT_MAX_STATES):
+    """The best Build for build_problems() output within budget XP, or None."""
+    rules = rules or XPRules()
+    must_trees = {tree_name for tree_name, rows in problems if any(row[4] for row in rows)}
+    jobs = [(rows, budget, max_states) for _, rows in problems]
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_tree_job, jobs))
+    else:
+        results = [solve_tree(*job) for job in jobs]
+    tables = [table for table, _ in results]
+    exact = all(tree_exact for _, tree_exact in results)
+
+    # Combine trees: state is (trees used, capped at the free count) + XP spent
+    states = {(0, 0): (0, ())}
+    for (tree_name, _), table in zip(problems, tables):
+        # Distinct non-empty options for this tree, cheapest first
+        options = {}
+        for entry in table:
+            if entry is not None and entry[2]:
+                options[entry[1]] = entry
+        next_states = {}
+
+        def offer(state, value):
+            old = next_states.get(state)
+            if old is None or value[0] > old[0]:
+                next_states[state] = value
+
+        for (used, spent), (weight, picks) in states.items():
+            if tree_name not in must_trees:
+                offer((used, spent), (weight, picks))
+            surcharge = rules.tree_xp_cost if used >= rules.free_trees else 0
+            for cost, (t_weight, _, ids) in options.items():
+                total = spent + cost + surcharge
+                if total <= budget:
+                    offer((min(used + 1, rules.free_trees), total),
+                          (weight + t_weight, picks + tuple((tree_name, tid) for tid in ids)))
+        states = next_states
+        if not states:
+            return None
+
+    (_, spent), (weight, picks) = max(states.items(), key=lambda s: (s[1][0], -s[0][1]))
+    return Build(list(picks), spent, weight, exact)
+
+
+def load_weights(path):
+    """Read a {"TREE:ID": weight} file into {(tree_name, talent_id): weight}."""
+    with open(path, "r", encoding="utf-8") as f:
+        return {tuple(k.split(":", 1)): v for k, v in json.load(f).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest the best talent build for an XP budget.")
+    parser.add_argument("--xp", type=int, required=True, help="XP budget")
+    parser.add_argument("--must", nargs="*", default=[], metavar="TREE:ID", help="talents that must be taken")
+    parser.add_argument("--weights", help='JSON file of {"TREE:ID": weight}')
+    parser.add_argument("--max-states", type=int, default=DEFAULT_MAX_STATES, help="per-tree search cap")
+    batch_pool.add_arguments(parser)
+    args = parser.parse_args()
+
+    graph, rules = batch_pool.load(args)
+    weights = load_weights(args.weights) if args.weights else None
+    must = [tuple(m.split(":", 1)) for m in args.must]
+    unknown = [m for m, key in zip(args.must, must)
+               if len(key) != 2 or key[0] not in graph.trees_by_name or key[1] not in graph.tree(key[0]).talents]
+    if unknown:
+        parser.error(f"unknown talent(s): {', '.join(unknown)}")
+
+    build = suggest_build(graph, args.xp, rules, weights, must, workers=args.workers or os.cpu_count(),
+                          max_states=args.max_states)
+    if build is None:
+        print("No build fits that budget.")
+        return
+    print(f"XP spent: {build.xp_spent} / {args.xp}   weight: {build.weight}")
+    if not build.exact:
+        print("  (search capped by --max-states; a better build may exist)")
+    for tree_name, talent_id in build.talents:
+        print(f"  {tree_name:<14}{talent_id:<6}{graph.talent(tree_name, talent_id).name}")
+
+
+if __name__ == "__main__":
+    main()
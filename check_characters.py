@@ -0,0 +1,122 @@
+"""Validate and cost character files against the current talent data, headlessly.
+
+    python check_characters.py characters/ [more files or dirs] [--data data.json] [--workers 4] [--json report.json]
+
+For every character file (the Save Character format: selected_talents,
+xp_total, xp_spent) this resolves each talent against the current trees,
+recomputes XP with the app's tier and tree-surcharge rules and flags:
+unknown talents, saved xp_spent that no longer matches, builds over their
+xp_total, and talents taken without any of their prerequisites.
+
+Files are checked in a process pool. Nothing here imports tkinter.
+"""
+import argparse
+import json
+import os
+import sys
+
+import batch_pool
+from xp_engine import XPEngine
+
+
+def check_character(path, graph=None, rules=None):
+    """Return a report dict for one character file."""
+    graph = graph or batch_pool.graph
+    rules = rules or batch_pool.rules
+    report = {"file": path, "problems": []}
+    problems = report["problems"]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            char_save = json.load(f)
+        entries = char_save.get("selected_talents", [])
+    except (OSError, ValueError, AttributeError) as e:
+        problems.append(f"unreadable: {e}")
+        return report
+    if not isinstance(entries, list):
+        problems.append("unreadable: selected_talents is not a list")
+        return report
+
+    # Each entry must be [tree_name, talent_id]; anything else would break the XP engine's lookups
+    selection = []
+    for entry in entries:
+        if isinstance(entry, list) and len(entry) >= 2 and isinstance(entry[0], str) and isinstance(entry[1], str):
+            selection.append((entry[0], entry[1]))
+        else:
+            problems.append(f"malformed selected_talents entry {json.dumps(entry)}")
+
+    engine = XPEngine(graph, rules)
+    for tree_name, talent_id in engine.load(selection):
+        moved = graph.find_talent(talent_id)
+        hint = f" (now in {moved.tree})" if moved is not None and moved.tree != tree_name else ""
+        problems.append(f"unknown talent {tree_name}/{talent_id}{hint}")
+
+    for tree_name, talent_id in sorted(engine.selected):
+        prereqs = graph.tree(tree_name).prerequisites(talent_id)
+        if prereqs and not any((tree_name, p) in engine.selected for p in prereqs):
+            problems.append(f"{tree_name}/{talent_id} taken without any of {', '.join(sorted(prereqs))}")
+
+    spent = engine.spent
+    report["xp_spent"] = spent
+    saved_spent = _xp_value(char_save, "xp_spent", problems)
+    xp_total = _xp_value(char_save, "xp_total", problems)
+    if saved_spent is not None and saved_spent != spent:
+        problems.append(f"xp_spent is {saved_spent} but recomputes to {spent}")
+    if xp_total is not None and spent > xp_total:
+        problems.append(f"spends {spent} XP of {xp_total}")
+    return report
+
+
+def _xp_value(char_save, key, problems):
+    # Coerced with int() like the builder's load_character, so "40" and 40 are the same total
+    value = char_save.get(key)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        problems.append(f"{key} is not a number: {json.dumps(value)}")
+        return None
+
+
+def iter_character_files(paths):
+    # Stream *.json files from directories (non-recursive) and explicit file paths
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        yield entry.path
+        else:
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check character files against the talent data.")
+    parser.add_argument("paths", nargs="+", help="character files or directories of them")
+    batch_pool.add_arguments(parser)
+    parser.add_argument("--json", help="also write the full report to this file")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print files with problems")
+    args = parser.parse_args(argv)
+
+    graph, _ = batch_pool.load(args)
+    reports = []
+    with batch_pool.worker_pool(args, graph) as pool:
+        for report in pool.map(check_character, iter_character_files(args.paths), chunksize=8):
+            reports.append(report)
+            if report["problems"]:
+                print(f"FAIL {report['file']}")
+                for problem in report["problems"]:
+                    print(f"     {problem}")
+            elif not args.quiet:
+                print(f"ok   {report['file']} ({report['xp_spent']} XP)")
+
+    failed = sum(1 for r in reports if r["problems"])
+    print(f"{len(reports)} file(s) checked, {failed} with problems")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=4)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
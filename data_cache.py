@@ -0,0 +1,121 @@
+"""Compiled, validated cache of the talent data file.
+
+The first load of a data file parses the JSON, validates it and writes a
+marshal-encoded compact copy next to it (``data.json`` -> ``data.json.cache``).
+Later loads read the cache directly, skipping both JSON parsing and
+validation, as long as the source file's mtime/size match, or, if they
+don't, its SHA-256 still does.
+"""
+import hashlib
+import json
+import marshal
+import os
+from pathlib import Path
+
+from talent_model import TalentGraph
+from xp_engine import DEFAULT_TIER_XP_VALUES
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 1
+
+
+class DataValidationError(ValueError):
+    def __init__(self, path, problems):
+        self.path = path
+        self.problems = problems
+        super().__init__(f"{path}: {len(problems)} problem(s)\n  " + "\n  ".join(problems))
+
+
+def validate(graph, tier_count=len(DEFAULT_TIER_XP_VALUES)):
+    """Return a list of problems: duplicate ids, dangling connections, bad positions."""
+    problems = []
+    seen = {}
+    for tree in graph.trees:
+        problems += validate_tree(tree, tier_count, seen)
+    return problems
+
+
+def validate_tree(tree, tier_count=len(DEFAULT_TIER_XP_VALUES), seen=None):
+    """Problems within one tree. seen ({id: tree_name}) catches ids repeated across trees and is updated."""
+    problems = []
+    seen = {} if seen is None else seen
+    for talent in tree:
+        if talent.id in seen:
+            problems.append(f"{tree.name}: duplicate id {talent.id!r} (also in {seen[talent.id]})")
+        seen[talent.id] = tree.name
+        for conn_id in talent.out:
+            if conn_id not in tree.talents:
+                problems.append(f"{tree.name}: {talent.id} connects to unknown id {conn_id!r}")
+        x, y = talent.position
+        if not (talent.is_root or (0 <= x < tier_count and y >= 0)):
+            problems.append(f"{tree.name}: {talent.id} position {list(talent.position)} is outside the {tier_count} tiers")
+    return problems
+
+
+def _raw_duplicates(data):
+    # Duplicates inside one tree collapse when indexed, so check the raw dicts
+    problems = []
+    for tree in data.get("trees", []):
+        seen = set()
+        for t in tree.get("talents", []):
+            if t["id"] in seen:
+                problems.append(f"{tree.get('name')}: duplicate id {t['id']!r}")
+            seen.add(t["id"])
+    return problems
+
+
+def cache_path(path):
+    path = Path(path)
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_graph(path, use_cache=True, tier_count=len(DEFAULT_TIER_XP_VALUES)):
+    """Load a data file as a TalentGraph, via the compiled cache when it's fresh.
+
+    Raises DataValidationError if the source has to be compiled and is invalid.
+    """
+    path = Path(path)
+    cpath = cache_path(path)
+    stamp = _stamp(path)
+    if use_cache:
+        try:
+            # marshal.loads on one read is far faster than marshal.load on the file
+            version, c_stamp, c_hash, c_tiers, compact = marshal.loads(cpath.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            version = None
+        if version == CACHE_VERSION and c_tiers == tier_count:
+            if tuple(c_stamp) == stamp:
+                return TalentGraph.from_compact(compact)
+            # Touched but possibly unchanged (e.g. checkout): compare content
+            raw = path.read_bytes()
+            if hashlib.sha256(raw).hexdigest() == c_hash:
+                _write_cache(cpath, stamp, c_hash, tier_count, compact)
+                return TalentGraph.from_compact(compact)
+            return _compile(path, cpath, raw, stamp, tier_count)
+    return _compile(path, cpath if use_cache else None, path.read_bytes(), stamp, tier_count)
+
+
+def _compile(path, cpath, raw, stamp, tier_count):
+    data = json.loads(raw)
+    graph = TalentGraph.from_dict(data)
+    problems = _raw_duplicates(data) + validate(graph, tier_count)
+    if problems:
+        raise DataValidationError(path, problems)
+    if cpath is not None:
+        _write_cache(cpath, stamp, hashlib.sha256(raw).hexdigest(), tier_count, graph.to_compact())
+    return graph
+
+
+def _write_cache(cpath, stamp, digest, tier_count, compact):
+    # Write then rename so a half-written cache is never picked up
+    tmp = cpath.with_name(cpath.name + ".tmp")
+    try:
+        tmp.write_bytes(marshal.dumps((CACHE_VERSION, stamp, digest, tier_count, compact)))
+        os.replace(tmp, cpath)
+    except OSError as e:
+        print("Could not write data cache:", e)
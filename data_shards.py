@@ -0,0 +1,150 @@
+"""Sharded talent data: a small manifest plus one JSON file per tree.
+
+    data/
+        manifest.json   {"version": 1, "trees": [{"name": "Shaper", "file": "shaper.json"}, ...]}
+        shaper.json     one entry of data.json's "trees" list
+        ...
+
+ShardedStore.open() builds a TalentGraph whose trees are unloaded
+placeholders in manifest order; TalentGraph.ensure_tree() reads a tree's
+file the first time a tab or character needs it, validating it on the way.
+Saves (see DataWriter) write only the tree files that were edited.
+
+Convert to and from the single-file format with:
+
+    python data_shards.py import data.json data/
+    python data_shards.py export data/ data.json
+"""
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from data_cache import DataValidationError, _raw_duplicates, validate_tree
+from data_writer import atomic_write_json
+from talent_model import TalentGraph, Tree
+from xp_engine import DEFAULT_TIER_XP_VALUES
+
+MANIFEST = "manifest.json"
+SHARD_VERSION = 1
+
+
+def manifest_path(path):
+    # Accept either the shard directory or its manifest
+    path = Path(path)
+    return path if path.name == MANIFEST else path / MANIFEST
+
+
+def is_sharded(path):
+    return manifest_path(path).is_file()
+
+
+def _shard_name(tree_name, taken):
+    stem = re.sub(r"[^a-z0-9]+", "-", tree_name.lower()).strip("-") or "tree"
+    name, n = f"{stem}.json", 1
+    while name in taken:
+        n += 1
+        name = f"{stem}-{n}.json"
+    taken.add(name)
+    return name
+
+
+class ShardedStore:
+    def __init__(self, path, tier_count=len(DEFAULT_TIER_XP_VALUES)):
+        self.manifest_path = manifest_path(path)
+        self.root = self.manifest_path.parent
+        self.tier_count = tier_count
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != SHARD_VERSION:
+            raise DataValidationError(self.manifest_path, [f"unsupported manifest version {self.manifest.get('version')!r}"])
+        self.files = {entry["name"]: entry["file"] for entry in self.manifest["trees"]}  # {tree_name: file name}
+
+    def open(self):
+        """A TalentGraph with every tree listed but none loaded yet."""
+        graph = TalentGraph()
+        graph.extra = self.manifest.get("extra")
+        graph.source = self
+        for tree_name in self.files:
+            graph.add_unloaded_tree(tree_name)
+        return graph
+
+    def tree_path(self, tree_name):
+        return self.root / self.files[tree_name]
+
+    def load_tree(self, graph, tree_name):
+        # Called through graph.ensure_tree(); raises DataValidationError for a bad shard
+        path = self.tree_path(tree_name)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        problems = []
+        if data.get("name") != tree_name:
+            problems.append(f"file holds tree {data.get('name')!r}, manifest says {tree_name!r}")
+        tree = Tree.from_dict(data)
+        seen = {talent_id: talent.tree for talent_id, talent in graph.talent_index.items()}
+        problems += _raw_duplicates({"trees": [data]}) + validate_tree(tree, self.tier_count, seen)
+        if problems:
+            raise DataValidationError(path, problems)
+        graph.set_tree(tree)
+
+    def load_all(self, graph):
+        for tree in list(graph.trees):
+            graph.ensure_tree(tree.name)
+
+    def snapshot(self, graph, tree_names):
+        """[(path, tree dict)] for the loaded trees among tree_names, taken on the caller's thread."""
+        return [(self.tree_path(name), graph.tree(name).to_dict())
+                for name in tree_names if name in self.files and graph.tree(name).loaded]
+
+
+def import_file(data_path, shard_dir):
+    """Split a single-file data.json into a shard directory. Returns the manifest path."""
+    with open(data_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    taken = {MANIFEST}
+    entries = []
+    for tree_data in data.get("trees", []):
+        file_name = _shard_name(tree_data["name"], taken)
+        atomic_write_json(shard_dir / file_name, tree_data)
+        entries.append({"name": tree_data["name"], "file": file_name})
+    manifest = {"version": SHARD_VERSION, "trees": entries}
+    extra = {k: v for k, v in data.items() if k != "trees"}
+    if extra:
+        manifest["extra"] = extra
+    atomic_write_json(shard_dir / MANIFEST, manifest)
+    return shard_dir / MANIFEST
+
+
+def export_file(shard_dir, data_path):
+    """Join a shard directory back into a single-file data.json."""
+    store = ShardedStore(shard_dir)
+    graph = store.open()
+    store.load_all(graph)
+    atomic_write_json(data_path, graph.to_dict())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert talent data between data.json and a sharded directory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="split data.json into one file per tree")
+    imp.add_argument("data")
+    imp.add_argument("shard_dir")
+    exp = sub.add_parser("export", help="join a shard directory into one data.json")
+    exp.add_argument("shard_dir")
+    exp.add_argument("data")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        path = import_file(args.data, args.shard_dir)
+        print(f"Wrote {path}")
+    else:
+        export_file(args.shard_dir, args.data)
+        print(f"Wrote {args.data}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
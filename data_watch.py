@@ -0,0 +1,182 @@
+"""Live reload of the talent data file.
+
+DataWatcher polls the file's mtime/size on a background thread and, when
+it changes, loads it there (validated, journal replayed) and queues the new
+graph. The UI thread picks it up with poll(), diffs it against the model it
+shows with diff_graphs() and patches that model in place with apply_diff(),
+so only the trees, talents and connections that changed need redrawing.
+"""
+import os
+import queue
+import threading
+
+import data_cache
+import data_writer
+from xp_engine import DEFAULT_TIER_XP_VALUES
+
+
+class TreeDiff:
+    """Changes to one tree: talent ids added/removed/edited/moved and edges (from, to)."""
+    __slots__ = ("name", "added", "removed", "edited", "moved", "connected", "disconnected", "reordered")
+
+    def __init__(self, name):
+        self.name = name
+        self.added = []
+        self.removed = []
+        self.edited = []         # name, description or extra keys changed
+        self.moved = []          # position changed
+        self.connected = []
+        self.disconnected = []   # includes the edges of removed talents
+        self.reordered = False   # only file order (talents, connections, tree keys) changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.edited or self.moved
+                    or self.connected or self.disconnected or self.reordered)
+
+    def __repr__(self):
+        return (f"TreeDiff({self.name!r}, added={self.added}, removed={self.removed}, edited={self.edited}, "
+                f"moved={self.moved}, connected={self.connected}, disconnected={self.disconnected})")
+
+
+class GraphDiff:
+    __slots__ = ("added_trees", "removed_trees", "trees", "reordered")
+
+    def __init__(self):
+        self.added_trees = []
+        self.removed_trees = []
+        self.trees = {}          # {tree_name: TreeDiff}, only trees that changed
+        self.reordered = False   # tree order or top-level keys changed
+
+    def __bool__(self):
+        return bool(self.added_trees or self.removed_trees or self.trees or self.reordered)
+
+
+def diff_trees(old, new):
+    d = TreeDiff(new.name)
+    old_talents = old.talents
+    for talent_id, t in new.talents.items():
+        o = old_talents.get(talent_id)
+        if o is None:
+            d.added.append(talent_id)
+            continue
+        if o.name != t.name or o.description != t.description or o.extra != t.extra:
+            d.edited.append(talent_id)
+        if o.position != t.position:
+            d.moved.append(talent_id)
+    d.removed = [talent_id for talent_id in old_talents if talent_id not in new.talents]
+    old_edges = list(old.edges())
+    new_edges = list(new.edges())
+    old_set, new_set = set(old_edges), set(new_edges)
+    d.connected = [e for e in new_edges if e not in old_set]
+    d.disconnected = [e for e in old_edges if e not in new_set]
+    if not d:
+        d.reordered = old_edges != new_edges or list(old_talents) != list(new.talents) or old.extra != new.extra
+    return d
+
+
+def diff_graphs(old, new):
+    """What it takes to turn old into new. Unloaded (sharded) trees in old are skipped."""
+    diff = GraphDiff()
+    for tree in new.trees:
+        old_tree = old.trees_by_name.get(tree.name)
+        if old_tree is None:
+            diff.added_trees.append(tree.name)
+        elif old_tree.loaded:
+            d = diff_trees(old_tree, tree)
+            if d:
+                diff.trees[tree.name] = d
+    diff.removed_trees = [tree.name for tree in old.trees if tree.name not in new.trees_by_name]
+    kept = [tree.name for tree in old.trees if tree.name in new.trees_by_name]
+    diff.reordered = kept != [name for name in new.trees_by_name if name in old.trees_by_name] or old.extra != new.extra
+    return diff
+
+
+def apply_diff(graph, new, diff):
+    """Patch graph in place so it matches new, keeping its Tree/Talent objects where they survive."""
+    for tree_name in diff.removed_trees:
+        graph.remove_tree(tree_name)
+    for tree_name in diff.added_trees:
+        graph.add_tree(new.tree(tree_name).to_dict())
+    for tree_name, d in diff.trees.items():
+        tree, new_tree = graph.tree(tree_name), new.tree(tree_name)
+        for from_id, to_id in d.disconnected:
+            if from_id in tree.talents and to_id in tree.talents:
+                graph.remove_connection(tree_name, from_id, to_id)
+        for talent_id in d.removed:
+            graph.remove_talent(tree_name, talent_id)
+        for talent_id in d.added:
+            graph.add_talent(tree_name, new_tree.talents[talent_id].to_dict())
+        for talent_id in d.edited:
+            talent, source = tree.talents[talent_id], new_tree.talents[talent_id]
+            graph.set_text(tree_name, talent_id, source.name, source.description)
+            talent.extra = source.extra
+        for talent_id in d.moved:
+            tree.talents[talent_id].position = new_tree.talents[talent_id].position
+        for from_id, to_id in d.connected:
+            graph.add_connection(tree_name, from_id, to_id)
+        # Match the file's order so a later save writes it back unchanged
+        tree.talents = {talent_id: tree.talents[talent_id] for talent_id in new_tree.talents}
+        for talent_id, source in new_tree.talents.items():
+            tree.talents[talent_id].out = dict.fromkeys(source.out)
+        tree.by_position = {talent.position: talent for talent in tree}
+        tree.extra = new_tree.extra
+    if diff.reordered or diff.added_trees:
+        graph.trees.sort(key=lambda t: new.trees_by_name[t.name].index)
+        for i, tree in enumerate(graph.trees):
+            tree.index = i
+    graph.extra = new.extra
+
+
+class DataWatcher:
+    """Polls a data file for outside changes and parses new versions off the UI thread.
+
+    ignore(stamp) may return True for (mtime_ns, size) stamps the app wrote itself.
+    """
+    def __init__(self, path, interval=1.0, ignore=None, tier_count=len(DEFAULT_TIER_XP_VALUES)):
+        self.path = path
+        self.interval = interval
+        self.ignore = ignore
+        self.tier_count = tier_count
+        self.results = queue.Queue()  # (graph, None) or (None, error)
+        self._stamp = self._read_stamp()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+
+    def _read_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None  # e.g. mid-replace by an editor
+        return st.st_mtime_ns, st.st_size
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stamp = self._read_stamp()
+            if stamp is None or stamp == self._stamp:
+                continue
+            self._stamp = stamp
+            if self.ignore is not None and self.ignore(stamp):
+                continue
+            try:
+                graph = data_cache.load_graph(self.path, tier_count=self.tier_count)
+                data_writer.replay_journal(graph, self.path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # e.g. a half-written file, or a tree/talent missing a required key;
+                # report it and keep watching for the next save
+                self.results.put((None, e))
+                continue
+            self.results.put((graph, None))
+
+    def poll(self):
+        """The newest (graph, error) result since the last poll, or None."""
+        result = None
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return result
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
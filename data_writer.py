@@ -0,0 +1,224 @@
+"""Background, atomic, dirty-only saving of the talent data file.
+
+Edits are recorded as the model's edit records (see TalentGraph.apply_edit).
+A full save snapshots the model on the caller's thread, then serialises and
+writes it on a single writer thread: temp file, fsync, os.replace, so a
+crash mid-write never leaves a truncated data file. Saving with no edits
+since the last save is a no-op.
+
+With the optional journal, autosaves append just the new edit records to
+``data.json.journal`` (one JSON line each). The journal is compacted into a
+full save once it grows past ``compact_every`` records, and is replayed on
+top of the data file at load time.
+
+For sharded data (see data_shards) path is the manifest and a full save
+writes only the files of trees edited since the last one.
+"""
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path(path):
+    path = Path(path)
+    return path.with_name(path.name + JOURNAL_SUFFIX)
+
+
+def read_journal(path):
+    """Yield the edit records journalled for the data file at path."""
+    jpath = journal_path(path)
+    if not jpath.exists():
+        return
+    with open(jpath, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # torn last line from a crash mid-append
+            yield tuple(record)
+
+
+def _resolves(graph, record):
+    # Whether every tree and talent a record names still exists (the data file may have been edited since)
+    kind = record[0]
+    if (kind == "connect" and len(record) == 5) or (kind == "swap" and len(record) == 6):
+        talent_ids = record[2:4]
+    elif kind == "text" and len(record) == 7:
+        talent_ids = record[2:3]
+    else:
+        return False
+    tree = graph.trees_by_name.get(record[1])
+    if tree is None:
+        return False
+    if graph.source is not None:
+        graph.ensure_tree(tree.name)  # sharded data: the edited tree must be loaded first
+    return all(talent_id in tree.talents for talent_id in talent_ids)
+
+
+def replay_journal(graph, path):
+    """Apply any journalled edits for the data file at path. Returns the number applied.
+
+    Records that no longer resolve against graph are skipped and reported.
+    """
+    count = 0
+    skipped = []
+    for record in read_journal(path):
+        if not record or not _resolves(graph, record):
+            skipped.append(record)
+            continue
+        graph.apply_edit(record)
+        count += 1
+    if skipped:
+        print(f"Skipped {len(skipped)} journal record(s) that no longer match {Path(path).name}:", skipped)
+    return count
+
+
+def atomic_write_json(path, data, indent=4):
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class DataWriter:
+    def __init__(self, path, journal=False, compact_every=200, store=None):
+        self.path = Path(path)
+        self.store = store         # data_shards.ShardedStore when saving per-tree files
+        self.journal = journal
+        self.compact_every = compact_every
+        self.generation = 0        # bumped on every recorded edit
+        self.saved_generation = 0  # generation on disk as a full save
+        self._queued_generation = 0
+        self._pending = []         # records not yet sent to the journal
+        self._journal_size = 0     # records in the journal file
+        self._dirty_trees = set()  # trees edited since the last full save
+        self.written_stamp = None  # (mtime_ns, size) of our last full save, so watchers can skip it
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="data-writer", daemon=True)
+        self._thread.start()
+        # loadData replays a journal left by an earlier --journal session whether or not
+        # this one journals, and those edits aren't in the data file yet
+        self._read_journal_state()
+        self.generation = self._journal_size
+
+    def _read_journal_state(self):
+        self._journal_size = 0
+        for record in read_journal(self.path):
+            self._journal_size += 1
+            if record:
+                self._dirty_trees.add(record[1])
+
+    @property
+    def dirty(self):
+        return self.generation != self._queued_generation
+
+    def record(self, record):
+        self.generation += 1
+        self._dirty_trees.add(record[1])
+        if self.journal:
+            self._pending.append(record)
+
+    def save(self, model, path=None):
+        """Queue a full atomic save of model. Returns False if there was nothing to save."""
+        if path is not None and Path(path) != self.path:
+            # One-off export to another file; doesn't affect dirty state or the journal
+            if self.store is not None:
+                self.store.load_all(model)
+            self._jobs.put(("full", Path(path), model.to_dict(), None))
+            return True
+        if not self.dirty:
+            return False
+        # Snapshot here, on the caller's thread, so the writer never sees a half-applied edit
+        if self.store is not None:
+            self._jobs.put(("shards", self.path, self.store.snapshot(model, self._dirty_trees), self.generation))
+        else:
+            self._jobs.put(("full", self.path, model.to_dict(), self.generation))
+        self._dirty_trees.clear()
+        self._queued_generation = self.generation
+        self._pending.clear()
+        self._journal_size = 0
+        return True
+
+    @property
+    def unjournalled(self):
+        # Edits since the last full save that only exist in memory
+        return self.generation - self._queued_generation - self._journal_size
+
+    def mark_reloaded(self):
+        """The model was just reloaded from disk with the journal replayed on top.
+
+        Edits that never reached the journal are gone; journalled ones are
+        in the model but still not in the data file, so they stay unsaved.
+        """
+        self._jobs.join()  # let queued journal appends land first
+        self._pending.clear()
+        self._dirty_trees.clear()
+        self._read_journal_state()
+        self._queued_generation = self.generation
+        self.generation += self._journal_size
+
+    def autosave(self, model):
+        """Append pending edits to the journal, compacting into a full save when it's long."""
+        if not self.journal or not self._pending:
+            return
+        if self._journal_size + len(self._pending) > self.compact_every:
+            self.save(model)
+            return
+        lines = "".join(json.dumps(r) + "\n" for r in self._pending)
+        self._jobs.put(("append", journal_path(self.path), lines, None))
+        self._journal_size += len(self._pending)
+        self._pending.clear()
+
+    def wait(self):
+        # Block until every queued write has finished
+        self._jobs.join()
+
+    def close(self, model=None):
+        # Flush outstanding journal records and wait for the writer to finish
+        if model is not None:
+            self.autosave(model)
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                return
+            kind, path, payload, generation = job
+            try:
+                if kind in ("full", "shards"):
+                    if kind == "full":
+                        atomic_write_json(path, payload)
+                        if generation is not None:
+                            st = os.stat(path)
+                            self.written_stamp = (st.st_mtime_ns, st.st_size)
+                    else:
+                        for shard_path, tree_data in payload:
+                            atomic_write_json(shard_path, tree_data)
+                    if generation is not None:
+                        self.saved_generation = generation
+                        # Everything journalled so far is now in the data file
+                        jpath = journal_path(path)
+                        if jpath.exists():
+                            jpath.unlink()
+                else:
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError as e:
+                print("Failed to save file:", e)
+            finally:
+                self._jobs.task_done()
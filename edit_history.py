@@ -0,0 +1,43 @@
+"""Bounded undo/redo history of tree edits.
+
+Entries are the model's compact edit records (see TalentGraph.apply_edit),
+which invert cheaply with invert_edit, so the history never snapshots data
+and undoing costs the same as the original edit.
+"""
+from collections import deque
+
+from talent_model import invert_edit
+
+
+class EditHistory:
+    def __init__(self, limit=500):
+        self.limit = limit
+        self._undo = deque(maxlen=limit)  # oldest edits fall off the end
+        self._redo = []
+
+    def __len__(self):
+        return len(self._undo)
+
+    def push(self, record):
+        self._undo.append(record)
+        self._redo.clear()
+
+    def undo(self):
+        """Return the record that reverts the last edit, or None."""
+        if not self._undo:
+            return None
+        record = self._undo.pop()
+        self._redo.append(record)
+        return invert_edit(record)
+
+    def redo(self):
+        """Return the record that re-applies the last undone edit, or None."""
+        if not self._redo:
+            return None
+        record = self._redo.pop()
+        self._undo.append(record)
+        return record
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
@@ -0,0 +1,212 @@
+"""Render talent trees to SVG (and PNG when Pillow is installed) without Tk.
+
+    python export_trees.py -o handouts/                          # every tree
+    python export_trees.py Shaper Focus --format svg png -o out/
+    python export_trees.py --character chars/*.json --used-only -o out/
+
+Tiles and lines are laid out with tile_layout, exactly as the builder's
+tabs are. With --character, each character gets its own subdirectory and
+its selected talents are highlighted. Trees render in a process pool.
+"""
+import argparse
+import json
+import re
+import sys
+import textwrap
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import batch_pool
+import tile_layout
+from xp_engine import XPEngine
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # PNG output needs Pillow
+    Image = None
+
+text_clr = "#DCE4EE"
+body_clr = "#1D1E1E"
+badge_clr = "#222222"
+char_width = 6.4     # average glyph width of the 11px body font, for wrapping
+line_height = 14
+
+
+#==== Scene ====
+# A scene is a list of primitives shared by both backends:
+#   ("rect", x, y, w, h, radius, fill)
+#   ("line", x1, y1, x2, y2, colour, width)
+#   ("text", x, y, text, size, colour, anchor, bold)   anchor: "n", "nw" or "se"
+def _wrap(text, width, max_lines):
+    chars = max(1, int(width / char_width))
+    lines = []
+    for para in text.split("\n"):
+        lines.extend(textwrap.wrap(para, chars) or [""])
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1][:max(0, chars - 1)] + "…"
+    return lines
+
+
+def tree_scene(tree, rules, selected=(), header=None):
+    """Return (width, height, primitives) for one tree, highlighting the selected talent ids."""
+    width, height = tile_layout.tree_extent(tree)
+    ops = [("rect", 0, 0, width, height, 0, tile_layout.canvas_bg),
+           ("text", 25, 30, tree.name, 30, text_clr, "nw", False)]
+    if header:
+        ops.append(("text", 25, 75, header, 14, text_clr, "nw", False))
+
+    anchors = {t.id: tile_layout.tile_anchor(*tile_layout.tile_rect(t.position)[:2]) for t in tree}
+    for from_id, to_id in tree.edges():
+        if to_id in anchors:
+            ops.append(("line", *anchors[from_id], *anchors[to_id], tile_layout.line_clr, 2))
+
+    for talent in tree:
+        px, py, w, h = tile_layout.tile_rect(talent.position)
+        fill = tile_layout.tile_hlight_clr if talent.id in selected else tile_layout.default_tile_clr
+        ops.append(("rect", px, py, w, h, 8, fill))
+        ops.append(("text", px + w / 2, py + 4, _wrap(talent.name, w - 8, 1)[0], 12, text_clr, "n", False))
+        ops.append(("rect", px + 3, py + 28, w - 6, h - 31, 0, body_clr))
+        body_lines = _wrap(talent.description, w - 16, max(1, int((h - 34) / line_height)))
+        for i, line in enumerate(body_lines):
+            ops.append(("text", px + 8, py + 31 + i * line_height, line, 11, text_clr, "nw", False))
+        if not talent.is_root:
+            xp_text = f"{rules.tier_cost(talent.position[0])} XP"
+            badge_w = len(xp_text) * 7 + 4
+            ops.append(("rect", px + w * 0.96 - badge_w, py + h * 0.96 - 15, badge_w, 15, 0, badge_clr))
+            ops.append(("text", px + w * 0.96 - 2, py + h * 0.96, xp_text, 11, text_clr, "se", True))
+    return width, height, ops
+
+
+#==== Backends ====
+_SVG_ANCHORS = {"n": ("middle", "hanging"), "nw": ("start", "hanging"), "se": ("end", "text-after-edge")}
+
+
+def to_svg(width, height, ops):
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{height:g}" '
+           f'viewBox="0 0 {width:g} {height:g}" font-family="Segoe UI, DejaVu Sans, sans-serif">']
+    for op in ops:
+        kind = op[0]
+        if kind == "rect":
+            _, x, y, w, h, r, fill = op
+            out.append(f'<rect x="{x:g}" y="{y:g}" width="{w:g}" height="{h:g}" rx="{r:g}" fill="{fill}"/>')
+        elif kind == "line":
+            _, x1, y1, x2, y2, colour, w = op
+            out.append(f'<line x1="{x1:g}" y1="{y1:g}" x2="{x2:g}" y2="{y2:g}" stroke="{colour}" stroke-width="{w}"/>')
+        else:
+            _, x, y, text, size, colour, anchor, bold = op
+            h_anchor, baseline = _SVG_ANCHORS[anchor]
+            weight = ' font-weight="bold"' if bold else ""
+            out.append(f'<text x="{x:g}" y="{y:g}" font-size="{size}" fill="{colour}" text-anchor="{h_anchor}" '
+                       f'dominant-baseline="{baseline}"{weight}>{escape(text)}</text>')
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+_PIL_ANCHORS = {"n": "mt", "nw": "lt", "se": "rb"}
+_fonts = {}
+
+
+def _font(size, bold):
+    key = (size, bold)
+    if key not in _fonts:
+        try:
+            _fonts[key] = ImageFont.truetype("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", size)
+        except OSError:
+            _fonts[key] = ImageFont.load_default()
+    return _fonts[key]
+
+
+def to_png(width, height, ops, path):
+    image = Image.new("RGB", (int(width), int(height)), tile_layout.canvas_bg)
+    draw = ImageDraw.Draw(image)
+    for op in ops:
+        kind = op[0]
+        if kind == "rect":
+            _, x, y, w, h, r, fill = op
+            draw.rounded_rectangle((x, y, x + w, y + h), radius=r, fill=fill)
+        elif kind == "line":
+            _, x1, y1, x2, y2, colour, w = op
+            draw.line((x1, y1, x2, y2), fill=colour, width=w)
+        else:
+            _, x, y, text, size, colour, anchor, bold = op
+            draw.text((x, y), text, fill=colour, font=_font(size, bold), anchor=_PIL_ANCHORS[anchor])
+    image.save(path)
+
+
+#==== Jobs ====
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "tree"
+
+
+def render_tree(job):
+    """Render one (tree_name, selected ids, header, output stem, formats) job. Returns the files written."""
+    tree_name, selected, header, stem, formats = job
+    width, height, ops = tree_scene(batch_pool.graph.tree(tree_name), batch_pool.rules, set(selected), header)
+    written = []
+    if "svg" in formats:
+        Path(stem + ".svg").write_text(to_svg(width, height, ops), encoding="utf-8")
+        written.append(stem + ".svg")
+    if "png" in formats:
+        to_png(width, height, ops, stem + ".png")
+        written.append(stem + ".png")
+    return written
+
+
+def load_character(path, graph, rules):
+    # Returns ({tree_name: [selected ids]}, header text) for the overlay
+    with open(path, "r", encoding="utf-8") as f:
+        char_save = json.load(f)
+    engine = XPEngine(graph, rules)
+    engine.load((t[0], t[1]) for t in char_save.get("selected_talents", []))
+    by_tree = {}
+    for tree_name, talent_id in engine.selected:
+        by_tree.setdefault(tree_name, []).append(talent_id)
+    header = f"{Path(path).stem}: {engine.spent} / {char_save.get('xp_total', '?')} XP"
+    return by_tree, header
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export talent trees to SVG/PNG.")
+    parser.add_argument("trees", nargs="*", help="tree names (default: all)")
+    parser.add_argument("-o", "--out", default="export", help="output directory")
+    parser.add_argument("--format", nargs="+", choices=("svg", "png"), default=["svg"])
+    parser.add_argument("--character", nargs="+", default=[], help="character files to overlay, one subdirectory each")
+    parser.add_argument("--used-only", action="store_true", help="with --character, skip trees it has no talents in")
+    batch_pool.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if "png" in args.format and Image is None:
+        print("PNG export needs Pillow (pip install pillow); writing SVG only")
+        args.format = [f for f in args.format if f != "png"] or ["svg"]
+
+    graph, rules = batch_pool.load(args)
+    tree_names = args.trees or [tree.name for tree in graph.trees]
+    unknown = [name for name in tree_names if name not in graph.trees_by_name]
+    if unknown:
+        parser.error(f"unknown tree(s): {', '.join(unknown)}")
+
+    out = Path(args.out)
+    jobs = []
+    if args.character:
+        for path in args.character:
+            by_tree, header = load_character(path, graph, rules)
+            char_dir = out / _slug(Path(path).stem)
+            char_dir.mkdir(parents=True, exist_ok=True)
+            for name in tree_names:
+                if by_tree.get(name) or not args.used_only:
+                    jobs.append((name, by_tree.get(name, []), header, str(char_dir / _slug(name)), args.format))
+    else:
+        out.mkdir(parents=True, exist_ok=True)
+        jobs = [(name, [], None, str(out / _slug(name)), args.format) for name in tree_names]
+
+    count = 0
+    with batch_pool.worker_pool(args, graph) as pool:
+        for written in pool.map(render_tree, jobs):
+            count += len(written)
+    print(f"Wrote {count} file(s) to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Cheapest prerequisite path to a talent, from the current selection.
+
+A talent needs at least one of its prerequisites (Tree.prerequisites) taken
+first, so the cheapest way to reach a target is a single chain of
+prerequisites ending at an entry point or an already selected talent. With
+prerequisites always in a lower column the tree is a DAG, and one pass in
+column order gives every talent's cheapest chain at once.
+
+Those per-tree tables depend only on the tree and which of its talents are
+selected. PathQuery memoises them per tree and selection, and an edit
+invalidates just the tree it touched. The tree surcharge for starting a new
+tree is added per query, since it depends on the selection elsewhere.
+Nothing here imports tkinter.
+"""
+
+
+class PathQuery:
+    def __init__(self, graph, rules, per_tree=8):
+        self.graph = graph
+        self.rules = rules
+        self.per_tree = per_tree  # selections remembered per tree
+        self._tables = {}         # {tree_name: {frozenset(selected ids): {id: (xp, length, parent)}}}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, tree_name=None):
+        # Connections or positions of tree_name changed (None: all trees)
+        if tree_name is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(tree_name, None)
+
+    def table(self, tree_name, taken):
+        """{talent_id: (xp, length, parent)} for the tree with the taken ids already selected."""
+        tables = self._tables.setdefault(tree_name, {})
+        table = tables.get(taken)
+        if table is not None:
+            self.hits += 1
+            return table
+        self.misses += 1
+        table = self._solve(self.graph.tree(tree_name), taken)
+        if len(tables) >= self.per_tree:
+            del tables[next(iter(tables))]  # oldest selection first
+        tables[taken] = table
+        return table
+
+    def _solve(self, tree, taken):
+        table = {}
+        for talent in sorted(tree, key=lambda t: t.position[0]):
+            if talent.id in taken:
+                table[talent.id] = (0, 0, None)
+                continue
+            cost = self.rules.talent_cost(talent)
+            best = None
+            for prereq in tree.prerequisites(talent.id):
+                entry = table[prereq]
+                if best is None or entry[:2] < table[best][:2]:
+                    best = prereq
+            if best is None:
+                table[talent.id] = (cost, 1, None)  # entry point
+            else:
+                xp, length, _ = table[best]
+                table[talent.id] = (xp + cost, length + 1, best)
+        return table
+
+    def cheapest_path(self, tree_name, talent_id, selected):
+        """(xp, [ids to take, in order]) to reach talent_id given the selected (tree, id) keys.
+
+        xp includes the tree surcharge when the path starts a new tree.
+        """
+        taken = frozenset(tid for tname, tid in selected if tname == tree_name)
+        table = self.table(tree_name, taken)
+        xp = table[talent_id][0]
+        path = []
+        current = talent_id
+        while current is not None and current not in taken:
+            path.append(current)
+            current = table[current][2]
+        path.reverse()
+        if path and not taken:
+            trees = len({tname for tname, _ in selected})
+            xp += self.rules.tree_surcharge(trees + 1) - self.rules.tree_surcharge(trees)
+        return xp, path
@@ -0,0 +1,125 @@
+"""Opt-in timing spans, gauges and an at-exit report.
+
+Enable with ``--profile [report.json]`` on the command line or the
+TREE_BUILDER_PROFILE environment variable (set to 1 or a report path).
+While disabled, span() hands back a shared no-op context manager and no
+methods are wrapped, so instrumentation costs next to nothing.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENV_VAR = "TREE_BUILDER_PROFILE"
+
+enabled = False
+report_path = None
+spans = {}    # {name: [seconds, ...]}
+gauges = {}   # {name: value}
+_NULL = contextlib.nullcontext()
+
+
+def enable(path=None):
+    global enabled, report_path
+    if enabled:
+        return
+    enabled = True
+    report_path = path or "profile.json"
+    atexit.register(write_report)
+
+
+def enable_from_env():
+    value = os.environ.get(ENV_VAR)
+    if value and value != "0":
+        enable(None if value == "1" else value)
+
+
+@contextlib.contextmanager
+def _span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def span(name):
+    """Context manager timing a named span (no-op when disabled)."""
+    return _span(name) if enabled else _NULL
+
+
+def sample(name, value):
+    if enabled:
+        gauges[name] = value
+
+
+def instrument(cls, methods):
+    """Wrap cls methods in spans. methods maps name -> label, or None for the method name.
+
+    A label may be a callable taking the call's arguments and returning a suffix,
+    e.g. lambda self, tab, tree: tree.name -> "populate_tab[Shaper]".
+    """
+    if not enabled:
+        return
+    for name, label in methods.items():
+        fn = getattr(cls, name)
+
+        def wrapper(*args, _fn=fn, _name=name, _label=label, **kwargs):
+            span_name = _name
+            if callable(_label):
+                span_name = f"{_name}[{_label(*args, **kwargs)}]"
+            elif _label:
+                span_name = _label
+            with _span(span_name):
+                return _fn(*args, **kwargs)
+
+        setattr(cls, name, functools.wraps(fn)(wrapper))
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KB elsewhere
+
+
+def summary():
+    rows = {}
+    for name, samples in spans.items():
+        rows[name] = {
+            "count": len(samples),
+            "total_ms": round(sum(samples) * 1000, 3),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+            "max_ms": round(max(samples) * 1000, 3),
+        }
+    return {"spans": rows, "gauges": dict(gauges), "peak_rss_kb": peak_rss_kb()}
+
+
+def format_report(data):
+    lines = [f"{'span':<40}{'count':>7}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+    for name, row in sorted(data["spans"].items(), key=lambda item: -item[1]["total_ms"]):
+        lines.append(f"{name:<40}{row['count']:>7}{row['total_ms']:>12.2f}{row['mean_ms']:>10.2f}{row['max_ms']:>10.2f}")
+    for name, value in data["gauges"].items():
+        lines.append(f"{name:<40}{value:>7}")
+    if data["peak_rss_kb"] is not None:
+        lines.append(f"{'peak RSS (MB)':<40}{data['peak_rss_kb'] / 1024:>7.1f}")
+    return "\n".join(lines)
+
+
+def write_report():
+    data = summary()
+    print(format_report(data))
+    try:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        print(f"Profile written to {report_path}")
+    except OSError as e:
+        print("Failed to write profile:", e)
@@ -0,0 +1,84 @@
+"""Inverted index over talent names and descriptions with prefix matching.
+
+Postings map each token to the (tree_name, talent_id) keys containing it, and
+a sorted token list makes prefix lookups a bisect plus a short scan. Updating
+one talent only touches that talent's tokens, so edits never need a rebuild.
+
+Query syntax: words are ANDed and each matches as a prefix; "or" separates
+alternatives, e.g. "omen or joker", "flip card".
+"""
+import re
+from bisect import bisect_left, insort
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_OR_RE = re.compile(r"\s+or\s+|\|", re.IGNORECASE)
+
+
+def tokenize(text):
+    return {t.strip("'") for t in _TOKEN_RE.findall(text.lower())} - {""}
+
+
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}  # {token: {(tree_name, talent_id)}}
+        self.tokens = []    # sorted distinct tokens, for prefix ranges
+        self.docs = {}      # {(tree_name, talent_id): tokens}, so updates can retract them
+
+    @classmethod
+    def from_graph(cls, graph):
+        index = cls()
+        for tree in graph.trees:
+            index.add_tree(tree)
+        return index
+
+    def add_tree(self, tree):
+        for talent in tree:
+            self.update(tree.name, talent.id, talent.name, talent.description)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def update(self, tree_name, talent_id, name, description):
+        key = (tree_name, talent_id)
+        new = tokenize(name) | tokenize(description)
+        old = self.docs.get(key, set())
+        for token in old - new:
+            postings = self.postings[token]
+            postings.discard(key)
+            if not postings:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+        for token in new - old:
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = set()
+                insort(self.tokens, token)
+            postings.add(key)
+        self.docs[key] = new
+
+    def remove(self, tree_name, talent_id):
+        self.update(tree_name, talent_id, "", "")
+        del self.docs[(tree_name, talent_id)]
+
+    def prefix(self, prefix):
+        """Keys of talents with any token starting with prefix."""
+        found = set()
+        i = bisect_left(self.tokens, prefix)
+        while i < len(self.tokens) and self.tokens[i].startswith(prefix):
+            found |= self.postings[self.tokens[i]]
+            i += 1
+        return found
+
+    def query(self, text):
+        results = set()
+        for alternative in _OR_RE.split(text.strip()):
+            terms = sorted(tokenize(alternative), key=len, reverse=True)  # longest (rarest) first
+            if not terms:
+                continue
+            hits = self.prefix(terms[0])
+            for term in terms[1:]:
+                if not hits:
+                    break
+                hits &= self.prefix(term)
+            results |= hits
+        return results
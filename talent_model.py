@@ -0,0 +1,347 @@
+"""In-memory talent graph built from the data.json schema.
+
+Trees and talents are indexed by name/id, and every talent keeps forward
+(``out``) and reverse (``inc``) adjacency so lookups and edits are O(1).
+Nothing here imports tkinter, so the model can be used headlessly.
+"""
+
+
+class Talent:
+    __slots__ = ("id", "name", "description", "position", "out", "inc", "tree", "extra")
+
+    def __init__(self, talent_id, name="", description="", position=(0, 0), tree=None, extra=None):
+        self.id = talent_id
+        self.name = name
+        self.description = description
+        self.position = tuple(position)
+        # Adjacency as insertion-ordered sets (dict keys) so saves keep the file's order
+        self.out = {}   # ids this talent connects to
+        self.inc = {}   # ids that connect to this talent
+        self.tree = tree
+        self.extra = extra  # any unknown keys from the source dict, kept for round-tripping
+
+    @classmethod
+    def from_dict(cls, t, tree_name=None):
+        # Adjacency is filled in by the tree once every talent exists
+        extra = {k: v for k, v in t.items() if k not in _TALENT_KEYS} or None
+        return cls(t["id"], t.get("name", ""), t.get("description", t.get("text", "")),
+                   t.get("position", (0, 0)), tree_name, extra)
+
+    @property
+    def is_root(self):
+        # The main tree talent is denoted by a negative position
+        return self.position[0] < 0 and self.position[1] < 0
+
+    @property
+    def is_placeholder(self):
+        # Unfinished tiles are left as "Blank" (or with no description) in the data
+        return self.name.strip().lower() == "blank" or not self.description.strip()
+
+    def to_dict(self):
+        d = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "position": list(self.position),
+            "connections": list(self.out),
+        }
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"Talent({self.id!r}, {self.name!r}, position={self.position})"
+
+
+class Tree:
+    __slots__ = ("name", "index", "talents", "by_position", "extra", "loaded")
+
+    def __init__(self, name, index=0, extra=None, loaded=True):
+        self.name = name
+        self.index = index
+        self.talents = {}       # {id: Talent}, in file order
+        self.by_position = {}   # {(column, row): Talent}
+        self.extra = extra
+        self.loaded = loaded    # False for a sharded tree whose file hasn't been read yet
+
+    @classmethod
+    def from_dict(cls, tree_data, index=0):
+        extra = {k: v for k, v in tree_data.items() if k not in ("name", "talents")} or None
+        tree = cls(tree_data["name"], index, extra)
+        for t in tree_data.get("talents", []):
+            talent = Talent.from_dict(t, tree.name)
+            tree.talents[talent.id] = talent
+            tree.by_position[talent.position] = talent
+        # Second pass so connections may point forward in the file
+        for t in tree_data.get("talents", []):
+            for conn_id in t.get("connections", []):
+                tree.talents[t["id"]].out[conn_id] = None
+                if conn_id in tree.talents:
+                    tree.talents[conn_id].inc[t["id"]] = None
+        return tree
+
+    def __iter__(self):
+        return iter(self.talents.values())
+
+    def __len__(self):
+        return len(self.talents)
+
+    def talent(self, talent_id):
+        return self.talents[talent_id]
+
+    def edges(self):
+        # Yield every (from_id, to_id) connection in the tree
+        for talent in self.talents.values():
+            for to_id in talent.out:
+                yield talent.id, to_id
+
+    def neighbours(self, talent_id):
+        # Talents joined to talent_id in either direction (edit mode treats edges as undirected)
+        talent = self.talents[talent_id]
+        return talent.out.keys() | talent.inc.keys()
+
+    def prerequisites(self, talent_id):
+        """Ids that unlock talent_id: connected talents in a lower column.
+
+        At least one of them must be taken first. An empty result means the
+        talent is an entry point (tier 0, root, or not yet connected leftwards).
+        The free root tile is never a prerequisite: players don't click it,
+        and only some trees connect it to their tier 0 talents.
+        """
+        talent = self.talents[talent_id]
+        column = talent.position[0]
+        talents = self.talents
+        return {n for n in self.neighbours(talent_id)
+                if n in talents and talents[n].position[0] < column and not talents[n].is_root}
+
+    def to_dict(self):
+        d = {"name": self.name, "talents": [t.to_dict() for t in self.talents.values()]}
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+
+class TalentGraph:
+    __slots__ = ("trees", "trees_by_name", "talent_index", "extra", "source")
+
+    def __init__(self):
+        self.trees = []          # [Tree], in file order
+        self.trees_by_name = {}  # {tree_name: Tree}
+        self.talent_index = {}   # {talent_id: Talent} across all (loaded) trees
+        self.extra = None
+        self.source = None       # loads unloaded trees on demand, e.g. a data_shards.ShardedStore
+
+    @classmethod
+    def from_dict(cls, data):
+        graph = cls()
+        graph.extra = {k: v for k, v in data.items() if k != "trees"} or None
+        for tree_data in data.get("trees", []):
+            graph.add_tree(tree_data)
+        return graph
+
+    def add_tree(self, tree_data):
+        tree = Tree.from_dict(tree_data, len(self.trees))
+        self.talent_index.update(tree.talents)
+        self.trees.append(tree)
+        self.trees_by_name[tree.name] = tree
+        return tree
+
+    def add_unloaded_tree(self, tree_name):
+        # Placeholder keeping the tree's name and tab order until source loads it
+        tree = Tree(tree_name, len(self.trees), loaded=False)
+        self.trees.append(tree)
+        self.trees_by_name[tree.name] = tree
+        return tree
+
+    def set_tree(self, tree):
+        """Replace the tree with the same name (e.g. a placeholder) in place."""
+        old = self.trees_by_name[tree.name]
+        for talent_id in old.talents:
+            self.talent_index.pop(talent_id, None)
+        tree.index = old.index
+        self.trees[old.index] = tree
+        self.trees_by_name[tree.name] = tree
+        self.talent_index.update(tree.talents)
+
+    def remove_tree(self, tree_name):
+        tree = self.trees_by_name.pop(tree_name)
+        self.trees.remove(tree)
+        for talent_id in tree.talents:
+            self.talent_index.pop(talent_id, None)
+        for i, t in enumerate(self.trees):
+            t.index = i
+        return tree
+
+    def ensure_tree(self, tree_name):
+        """Load a tree from source if it hasn't been yet. Returns True if it was loaded now."""
+        tree = self.trees_by_name[tree_name]
+        if tree.loaded:
+            return False
+        self.source.load_tree(self, tree_name)
+        return True
+
+    def to_dict(self):
+        d = {"trees": [tree.to_dict() for tree in self.trees]}
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def to_compact(self):
+        """Nested tuples of plain values (marshal/pickle friendly) mirroring the data."""
+        return (self.extra, tuple(
+            (tree.name, tree.extra, tuple((t.id, t.name, t.description, t.position[0], t.position[1], tuple(t.out), t.extra)
+                                          for t in tree.talents.values()))
+            for tree in self.trees))
+
+    @classmethod
+    def from_compact(cls, compact):
+        # Fast path for cached data: builds objects directly without intermediate dicts
+        graph = cls()
+        graph.extra, trees = compact
+        for name, extra, rows in trees:
+            tree = Tree(name, len(graph.trees), extra)
+            talents = tree.talents
+            for talent_id, t_name, desc, x, y, conns, t_extra in rows:
+                talent = Talent(talent_id, t_name, desc, (x, y), name, t_extra)
+                talent.out = dict.fromkeys(conns)
+                talents[talent_id] = talent
+                tree.by_position[talent.position] = talent
+                graph.talent_index[talent_id] = talent
+            for talent in talents.values():
+                for conn_id in talent.out:
+                    if conn_id in talents:
+                        talents[conn_id].inc[talent.id] = None
+            graph.trees.append(tree)
+            graph.trees_by_name[name] = tree
+        return graph
+
+    #==== Lookups ====
+    def tree(self, tree_name):
+        return self.trees_by_name[tree_name]
+
+    def talent(self, tree_name, talent_id):
+        return self.trees_by_name[tree_name].talents[talent_id]
+
+    def find_talent(self, talent_id):
+        return self.talent_index.get(talent_id)
+
+    def __iter__(self):
+        return iter(self.trees)
+
+    def __len__(self):
+        return len(self.trees)
+
+    #==== Edits ====
+    def add_connection(self, tree_name, from_id, to_id):
+        tree = self.trees_by_name[tree_name]
+        tree.talents[from_id].out[to_id] = None
+        tree.talents[to_id].inc[from_id] = None
+
+    def remove_connection(self, tree_name, from_id, to_id):
+        tree = self.trees_by_name[tree_name]
+        tree.talents[from_id].out.pop(to_id, None)
+        tree.talents[to_id].inc.pop(from_id, None)
+
+    def set_text(self, tree_name, talent_id, name, description):
+        talent = self.trees_by_name[tree_name].talents[talent_id]
+        talent.name = name
+        talent.description = description
+        return talent
+
+    def add_talent(self, tree_name, talent_data):
+        """Add a talent from a data.json-style dict, connections included."""
+        tree = self.trees_by_name[tree_name]
+        talent = Talent.from_dict(talent_data, tree_name)
+        tree.talents[talent.id] = talent
+        tree.by_position[talent.position] = talent
+        self.talent_index[talent.id] = talent
+        for conn_id in talent_data.get("connections", []):
+            talent.out[conn_id] = None
+            if conn_id in tree.talents:
+                tree.talents[conn_id].inc[talent.id] = None
+        for other in tree:
+            if talent.id in other.out:
+                talent.inc[other.id] = None
+        return talent
+
+    def remove_talent(self, tree_name, talent_id):
+        """Remove a talent and every connection to or from it."""
+        tree = self.trees_by_name[tree_name]
+        talent = tree.talents.pop(talent_id)
+        for to_id in talent.out:
+            if to_id in tree.talents:
+                tree.talents[to_id].inc.pop(talent_id, None)
+        for from_id in talent.inc:
+            tree.talents[from_id].out.pop(talent_id, None)
+        if tree.by_position.get(talent.position) is talent:
+            del tree.by_position[talent.position]
+        self.talent_index.pop(talent_id, None)
+        return talent
+
+    def set_position(self, tree_name, talent_id, position):
+        tree = self.trees_by_name[tree_name]
+        talent = tree.talents[talent_id]
+        if tree.by_position.get(talent.position) is talent:
+            del tree.by_position[talent.position]
+        talent.position = tuple(position)
+        tree.by_position[talent.position] = talent
+
+    #==== Edit records ====
+    # Edits are described by plain tuples so they can be journalled as JSON:
+    #   ("connect", tree, from_id, to_id, added)
+    #   ("swap", tree, a_id, b_id, a_position, b_position)  positions after the swap
+    #   ("text", tree, id, old_name, old_description, new_name, new_description)
+    # Applying a record sets the end state rather than toggling, so replaying
+    # one that is already applied is harmless.
+    def connection_edit(self, tree_name, from_id, to_id):
+        # Record for toggling the edge between two talents: an existing edge in
+        # either direction is removed, otherwise from_id -> to_id is added
+        tree = self.trees_by_name[tree_name]
+        if to_id in tree.talents[from_id].out:
+            return ("connect", tree_name, from_id, to_id, False)
+        if from_id in tree.talents[to_id].out:
+            return ("connect", tree_name, to_id, from_id, False)
+        return ("connect", tree_name, from_id, to_id, True)
+
+    def swap_edit(self, tree_name, from_id, to_id):
+        tree = self.trees_by_name[tree_name]
+        return ("swap", tree_name, from_id, to_id, tree.talents[to_id].position, tree.talents[from_id].position)
+
+    def text_edit(self, tree_name, talent_id, name, description):
+        talent = self.trees_by_name[tree_name].talents[talent_id]
+        return ("text", tree_name, talent_id, talent.name, talent.description, name, description)
+
+    def apply_edit(self, record):
+        kind, tree_name = record[0], record[1]
+        if kind == "connect":
+            _, _, from_id, to_id, added = record
+            if added:
+                self.add_connection(tree_name, from_id, to_id)
+            else:
+                self.remove_connection(tree_name, from_id, to_id)
+        elif kind == "swap":
+            _, _, a_id, b_id, a_pos, b_pos = record
+            self.set_position(tree_name, a_id, a_pos)
+            self.set_position(tree_name, b_id, b_pos)
+        elif kind == "text":
+            _, _, talent_id, _, _, name, description = record
+            self.set_text(tree_name, talent_id, name, description)
+        else:
+            raise ValueError(f"Unknown edit record {kind!r}")
+
+
+def invert_edit(record):
+    """Return the record that undoes record."""
+    kind = record[0]
+    if kind == "connect":
+        return record[:4] + (not record[4],)
+    if kind == "swap":
+        _, tree_name, a_id, b_id, a_pos, b_pos = record
+        return ("swap", tree_name, a_id, b_id, b_pos, a_pos)
+    if kind == "text":
+        _, tree_name, talent_id, old_name, old_desc, new_name, new_desc = record
+        return ("text", tree_name, talent_id, new_name, new_desc, old_name, old_desc)
+    raise ValueError(f"Unknown edit record {kind!r}")
+
+
+_TALENT_KEYS = ("id", "name", "description", "text", "position", "connections")
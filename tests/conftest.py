@@ -0,0 +1,15 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def shipped_data():
+    # The data.json shipped with the builder, as plain dicts; copy before mutating
+    with open(ROOT / "data.json", "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,113 @@
+import itertools
+import random
+
+import pytest
+
+import build_solver
+from benchmarks.synthetic import make_dataset, make_tree
+from talent_model import TalentGraph
+from xp_engine import XPEngine, XPRules
+
+RULES = XPRules(tier_xp_values=[2, 3, 5], tree_xp_cost=4, free_trees=1)
+
+
+def small_graph(rng, trees=3, talents=3):
+    data = {"trees": []}
+    for k in range(trees):
+        tiles = [{"id": f"r{k}", "name": "Root", "description": "root", "position": [-1, -1], "connections": []}]
+        for i in range(talents):
+            tiles.append({"id": f"t{k}_{i}", "name": f"T{i}", "description": "d", "position": [i % 3, i // 3],
+                          "connections": []})
+        for a, b in itertools.permutations(tiles[1:], 2):
+            if b["position"][0] > a["position"][0] and rng.random() < 0.25:
+                a["connections"].append(b["id"])
+        if rng.random() < 0.5:
+            tiles[0]["connections"].append(f"t{k}_0")
+        data["trees"].append({"name": f"Tree{k}", "talents": tiles})
+    return TalentGraph.from_dict(data)
+
+
+def brute_force(graph, budget, weights, must):
+    # Best (weight, -xp) over every subset that keeps must, honours prerequisites and fits
+    engine = XPEngine(graph, RULES)
+    keys = [(tree.name, t.id) for tree in graph for t in tree]
+    best = None
+    for r in range(len(keys) + 1):
+        for subset in itertools.combinations(keys, r):
+            chosen = set(subset)
+            if not must <= chosen:
+                continue
+            if any((p := graph.tree(tree_name).prerequisites(talent_id))
+                   and not any((tree_name, x) in chosen for x in p) for tree_name, talent_id in chosen):
+                continue
+            xp = engine.cost_of(chosen)
+            if xp <= budget:
+                value = (sum(weights[k] for k in chosen), -xp)
+                best = value if best is None or value > best else best
+    return best
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    graph = small_graph(rng)
+    keys = [(tree.name, t.id) for tree in graph for t in tree]
+    weights = {k: rng.randint(-1, 5) for k in keys}
+    must = set(rng.sample(keys, 1)) if seed % 3 == 0 else set()
+    budget = rng.randint(0, 25)
+
+    build = build_solver.suggest_build(graph, budget, rules=RULES, weights=weights, must_have=must)
+
+    expected = brute_force(graph, budget, weights, must)
+    assert (None if build is None else (build.weight, -build.xp_spent)) == expected
+    if build is not None:
+        assert build.exact
+        assert XPEngine(graph, RULES).cost_of(build.talents) == build.xp_spent
+        assert must <= set(build.talents)
+
+
+def test_placeholders_are_not_suggested(shipped_data):
+    graph = TalentGraph.from_dict(shipped_data)
+    build = build_solver.suggest_build(graph, 60)
+    assert build is not None
+    assert not [key for key in build.talents if graph.talent(*key).is_placeholder]
+
+
+def test_explicit_weight_overrides_placeholder(shipped_data):
+    graph = TalentGraph.from_dict(shipped_data)
+    blank = next(t for tree in graph for t in tree if t.is_placeholder and not graph.tree(t.tree).prerequisites(t.id))
+    build = build_solver.suggest_build(graph, 60, weights={(blank.tree, blank.id): 100})
+    assert (blank.tree, blank.id) in build.talents
+
+
+def test_large_tree_does_not_recurse():
+    graph = TalentGraph.from_dict({"trees": [make_tree("Big", 1200, columns=6, density=0.3)]})
+    build = build_solver.suggest_build(graph, 4)
+    assert build.xp_spent == 4 and build.weight == 1
+
+
+def test_state_cap_marks_build_inexact():
+    graph = TalentGraph.from_dict(make_dataset(trees=1, talents=200, columns=6, density=0.5))
+    capped = build_solver.suggest_build(graph, 40, max_states=50)
+    assert capped is not None and not capped.exact
+    assert capped.weight <= build_solver.suggest_build(graph, 40).weight
+
+
+def test_problems_solve_the_same_as_suggest_build(shipped_data):
+    graph = TalentGraph.from_dict(shipped_data)
+    must = {("Focus", "f16")}
+    problems = build_solver.build_problems(graph, must_have=must)
+    direct = build_solver.suggest_build(graph, 60, must_have=must)
+    split = build_solver.solve_problems(problems, 60)
+    assert (split.talents, split.xp_spent, split.weight) == (direct.talents, direct.xp_spent, direct.weight)
+
+
+def test_check_selection_reports_cost_and_missing_prerequisites(shipped_data):
+    graph = TalentGraph.from_dict(shipped_data)
+    tree = graph.tree("Athletics")
+    deep = [t.id for t in tree if tree.prerequisites(t.id) and t.position[0] >= 3][:2]
+    selection = {("Athletics", talent_id) for talent_id in deep}
+    xp, missing = build_solver.check_selection(graph, selection)
+    assert xp == XPEngine(graph).cost_of(selection)
+    assert missing == sorted(selection)
+    assert build_solver.suggest_build(graph, xp, must_have=selection) is None
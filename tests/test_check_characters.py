@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from check_characters import check_character
+from talent_model import TalentGraph
+from xp_engine import XPRules
+
+
+@pytest.fixture(scope="module")
+def graph(shipped_data):
+    return TalentGraph.from_dict(shipped_data)
+
+
+def check(tmp_path, graph, char_save):
+    path = tmp_path / "char.json"
+    path.write_text(json.dumps(char_save), encoding="utf-8")
+    return check_character(str(path), graph, XPRules())["problems"]
+
+
+def test_numeric_strings_are_coerced(tmp_path, graph):
+    assert check(tmp_path, graph, {"selected_talents": [["Athletics", "a1"]], "xp_total": "10", "xp_spent": "4"}) == []
+    assert check(tmp_path, graph, {"selected_talents": [["Athletics", "a1"]], "xp_total": "2"}) == ["spends 4 XP of 2"]
+
+
+def test_non_numeric_xp_is_reported(tmp_path, graph):
+    problems = check(tmp_path, graph, {"selected_talents": [], "xp_total": "lots", "xp_spent": [4]})
+    assert problems == ['xp_spent is not a number: [4]', 'xp_total is not a number: "lots"']
+
+
+def test_malformed_entries_are_reported_and_skipped(tmp_path, graph):
+    problems = check(tmp_path, graph, {"selected_talents": [["Shaper", ["x"]], ["Athletics", "a1"]], "xp_spent": 4})
+    assert problems == ['malformed selected_talents entry ["Shaper", ["x"]]']
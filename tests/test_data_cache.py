@@ -0,0 +1,95 @@
+import json
+import marshal
+import os
+
+import pytest
+
+import data_cache
+from data_cache import DataValidationError, cache_path, load_graph
+from talent_model import TalentGraph
+
+
+@pytest.fixture
+def data_file(tmp_path, shipped_data):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(shipped_data), encoding="utf-8")
+    return path
+
+
+def no_compile(*args):
+    raise AssertionError("the cache should have been used")
+
+
+def test_first_load_writes_the_cache(data_file, shipped_data):
+    graph = load_graph(data_file)
+    assert cache_path(data_file).exists()
+    assert graph.to_dict() == TalentGraph.from_dict(shipped_data).to_dict()
+
+
+def test_fresh_cache_skips_compiling(data_file, monkeypatch):
+    expected = load_graph(data_file).to_dict()
+    monkeypatch.setattr(data_cache, "_compile", no_compile)
+    assert load_graph(data_file).to_dict() == expected
+
+
+def test_touched_file_with_the_same_content_reuses_the_cache(data_file, monkeypatch):
+    load_graph(data_file)
+    st = os.stat(data_file)
+    os.utime(data_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    monkeypatch.setattr(data_cache, "_compile", no_compile)
+    load_graph(data_file)
+    # The hash matched, so the cache now carries the new stamp
+    _, stamp, _, _, _ = marshal.loads(cache_path(data_file).read_bytes())
+    assert tuple(stamp) == data_cache._stamp(data_file)
+
+
+def test_changed_content_recompiles(data_file, shipped_data):
+    load_graph(data_file)
+    data = json.loads(json.dumps(shipped_data))
+    data["trees"][0]["talents"][0]["name"] = "CHANGED"
+    data_file.write_text(json.dumps(data), encoding="utf-8")
+    st = os.stat(data_file)
+    os.utime(data_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # in case the rewrite kept the mtime
+    tree = data["trees"][0]
+    assert load_graph(data_file).talent(tree["name"], tree["talents"][0]["id"]).name == "CHANGED"
+
+
+def test_different_tier_count_recompiles(data_file):
+    load_graph(data_file)
+    with pytest.raises(DataValidationError):
+        load_graph(data_file, tier_count=3)
+
+
+def test_corrupt_cache_is_rebuilt(data_file, shipped_data):
+    load_graph(data_file)
+    cache_path(data_file).write_bytes(b"not marshal")
+    assert load_graph(data_file).to_dict() == TalentGraph.from_dict(shipped_data).to_dict()
+    version = marshal.loads(cache_path(data_file).read_bytes())[0]
+    assert version == data_cache.CACHE_VERSION
+
+
+def test_use_cache_false_never_writes_one(data_file):
+    load_graph(data_file, use_cache=False)
+    assert not cache_path(data_file).exists()
+
+
+def test_invalid_data_is_reported_and_not_cached(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"trees": [
+        {"name": "A", "talents": [
+            {"id": "a0", "name": "Root", "description": "", "position": [0, 0], "connections": ["zz"]},
+            {"id": "a0", "name": "Twin", "description": "x", "position": [1, 0], "connections": []},
+            {"id": "a1", "name": "Far", "description": "x", "position": [9, 0], "connections": []},
+        ]},
+        {"name": "B", "talents": [
+            {"id": "a1", "name": "Dup", "description": "x", "position": [0, 0], "connections": []},
+        ]},
+    ]}), encoding="utf-8")
+    with pytest.raises(DataValidationError) as info:
+        load_graph(path)
+    problems = info.value.problems
+    assert "A: duplicate id 'a0'" in problems
+    assert "A: a1 position [9, 0] is outside the 6 tiers" in problems
+    assert "B: duplicate id 'a1' (also in A)" in problems
+    assert any("connects to unknown id 'zz'" in p for p in problems)
+    assert not cache_path(path).exists()
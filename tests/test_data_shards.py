@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+import data_shards
+from data_cache import DataValidationError
+from data_writer import DataWriter
+from talent_model import TalentGraph
+
+
+@pytest.fixture
+def shard_dir(tmp_path, shipped_data):
+    data_path = tmp_path / "data.json"
+    data_path.write_text(json.dumps(shipped_data), encoding="utf-8")
+    data_shards.import_file(data_path, tmp_path / "data")
+    return tmp_path / "data"
+
+
+def test_import_export_round_trip(tmp_path, shard_dir, shipped_data):
+    out = tmp_path / "joined.json"
+    data_shards.export_file(shard_dir, out)
+    with open(out, "r", encoding="utf-8") as f:
+        joined = json.load(f)
+    assert joined == TalentGraph.from_dict(shipped_data).to_dict()
+
+
+def test_manifest_lists_one_file_per_tree(shard_dir, shipped_data):
+    manifest = json.loads((shard_dir / data_shards.MANIFEST).read_text(encoding="utf-8"))
+    assert [entry["name"] for entry in manifest["trees"]] == [tree["name"] for tree in shipped_data["trees"]]
+    files = [entry["file"] for entry in manifest["trees"]]
+    assert len(set(files)) == len(files)
+    assert all((shard_dir / name).is_file() for name in files)
+
+
+def test_trees_load_on_demand(shard_dir):
+    store = data_shards.ShardedStore(shard_dir)
+    graph = store.open()
+    assert not any(tree.loaded for tree in graph.trees)
+    assert graph.ensure_tree("Shaper") is True
+    assert graph.ensure_tree("Shaper") is False
+    assert graph.tree("Shaper").loaded and graph.talent("Shaper", "h0").name == "BURDEN OF STONE"
+    assert sum(tree.loaded for tree in graph.trees) == 1
+
+
+def test_shard_for_the_wrong_tree_is_rejected(shard_dir):
+    store = data_shards.ShardedStore(shard_dir)
+    tree_data = json.loads(store.tree_path("Shaper").read_text(encoding="utf-8"))
+    tree_data["name"] = "Other"
+    store.tree_path("Shaper").write_text(json.dumps(tree_data), encoding="utf-8")
+    with pytest.raises(DataValidationError, match="manifest says 'Shaper'"):
+        store.open().ensure_tree("Shaper")
+
+
+def test_save_writes_only_edited_trees(shard_dir):
+    store = data_shards.ShardedStore(shard_dir)
+    graph = store.open()
+    store.load_all(graph)
+    files = {tree.name: store.tree_path(tree.name) for tree in graph.trees}
+    before = {name: os.stat(path).st_ino for name, path in files.items()}
+
+    writer = DataWriter(store.manifest_path, store=store)
+    record = graph.text_edit("Shaper", "h0", "RENAMED", "")
+    graph.apply_edit(record)
+    writer.record(record)
+    assert writer.save(graph) is True
+    writer.close()
+
+    # Every write goes through a rename, so only a rewritten file gets a new inode
+    changed = {name for name, path in files.items() if os.stat(path).st_ino != before[name]}
+    assert changed == {"Shaper"}
+    reloaded = data_shards.ShardedStore(shard_dir).open()
+    reloaded.ensure_tree("Shaper")
+    assert reloaded.talent("Shaper", "h0").name == "RENAMED"
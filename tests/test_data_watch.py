@@ -0,0 +1,90 @@
+import copy
+import random
+
+import pytest
+
+import data_watch
+from talent_model import TalentGraph
+
+
+def mutate(data, rng, step):
+    """Apply one random outside edit to a data.json dict, the kind a text editor might make."""
+    trees = data["trees"]
+    tree = rng.choice(trees)
+    talents = tree["talents"]
+    op = rng.randrange(8) if len(talents) > 2 else 7
+    if op == 0:
+        gone = talents.pop(rng.randrange(1, len(talents)))["id"]
+        for t in talents:
+            t["connections"] = [c for c in t["connections"] if c != gone]
+    elif op == 1:
+        talents.append({"id": f"new{step}", "name": "New", "description": "added", "position": [rng.randrange(6), 9],
+                        "connections": [rng.choice(talents)["id"]]})
+    elif op == 2:
+        rng.choice(talents)["name"] += "!"
+    elif op == 3:
+        a, b = rng.sample(talents, 2)
+        a["position"], b["position"] = b["position"], a["position"]
+    elif op == 4:
+        a, b = rng.sample(talents, 2)
+        if b["id"] not in a["connections"]:
+            a["connections"].append(b["id"])
+    elif op == 5:
+        a = rng.choice(talents)
+        a["connections"] = a["connections"][1:]
+    elif op == 6:
+        rng.shuffle(talents)
+    elif len(trees) > 3 and rng.random() < 0.5:
+        trees.pop(rng.randrange(len(trees)))
+    else:
+        trees.insert(rng.randrange(len(trees) + 1), {"name": f"Tree{step}", "talents": [
+            {"id": f"x{step}", "name": "X", "description": "", "position": [0, 0], "connections": []}]})
+
+
+def test_unchanged_data_has_empty_diff(shipped_data):
+    diff = data_watch.diff_graphs(TalentGraph.from_dict(shipped_data), TalentGraph.from_dict(shipped_data))
+    assert not diff
+
+
+@pytest.mark.parametrize("seed", range(400))
+def test_apply_diff_matches_new_data(shipped_data, seed):
+    rng = random.Random(seed)
+    new = copy.deepcopy(shipped_data)
+    for step in range(rng.randint(1, 6)):
+        mutate(new, rng, f"{seed}_{step}")
+    graph = TalentGraph.from_dict(shipped_data)
+    survivors = {t.id: t for tree in graph.trees for t in tree}
+
+    data_watch.apply_diff(graph, TalentGraph.from_dict(new), data_watch.diff_graphs(graph, TalentGraph.from_dict(new)))
+
+    assert graph.to_dict() == new
+    assert [tree.index for tree in graph.trees] == list(range(len(graph.trees)))
+    assert set(graph.talent_index) == {t["id"] for tree in new["trees"] for t in tree["talents"]}
+    for tree in graph.trees:
+        assert tree.by_position == {talent.position: talent for talent in tree}
+        for talent in tree:
+            assert all(talent.id in tree.talents[to_id].inc for to_id in talent.out if to_id in tree.talents)
+            assert all(talent.id in tree.talents[from_id].out for from_id in talent.inc)
+            # Talents that survive keep their objects, so tiles bound to them stay valid
+            if talent.id in survivors and talent.tree == survivors[talent.id].tree:
+                assert talent is survivors[talent.id]
+
+
+def test_diff_reports_what_changed(shipped_data):
+    new = copy.deepcopy(shipped_data)
+    tree = new["trees"][0]
+    tree["talents"][1]["description"] = "changed"
+    removed = tree["talents"].pop()["id"]
+    new["trees"].pop()
+    diff = data_watch.diff_graphs(TalentGraph.from_dict(shipped_data), TalentGraph.from_dict(new))
+    tree_diff = diff.trees[tree["name"]]
+    assert tree_diff.edited == [tree["talents"][1]["id"]]
+    assert tree_diff.removed == [removed]
+    assert diff.removed_trees == [shipped_data["trees"][-1]["name"]]
+
+
+def test_unloaded_trees_are_skipped(shipped_data):
+    graph = TalentGraph()
+    for tree in shipped_data["trees"]:
+        graph.add_unloaded_tree(tree["name"])
+    assert not data_watch.diff_graphs(graph, TalentGraph.from_dict(shipped_data)).trees
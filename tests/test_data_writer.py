@@ -0,0 +1,171 @@
+import json
+import os
+
+import pytest
+
+import data_writer
+from data_writer import DataWriter, journal_path
+from talent_model import TalentGraph
+
+
+@pytest.fixture
+def data_file(tmp_path, shipped_data):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(shipped_data), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def open_writer(data_file):
+    # Writers made through this are closed after the test so their threads don't pile up
+    writers = []
+
+    def make(**kwargs):
+        writer = DataWriter(data_file, **kwargs)
+        writers.append(writer)
+        return writer
+    yield make
+    for writer in writers:
+        writer.close()
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return TalentGraph.from_dict(json.load(f))
+
+
+def edit(graph, writer, record):
+    graph.apply_edit(record)
+    writer.record(record)
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text("old", encoding="utf-8")
+    data_writer.atomic_write_json(path, {"trees": []})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"trees": []}
+    assert os.listdir(tmp_path) == ["out.json"]
+
+
+def test_failed_write_leaves_the_old_file(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text('{"trees": []}', encoding="utf-8")
+    with pytest.raises(TypeError):
+        data_writer.atomic_write_json(path, {"trees": [object()]})
+    assert path.read_text(encoding="utf-8") == '{"trees": []}'
+
+
+def test_save_without_edits_is_skipped(data_file, open_writer):
+    graph = load(data_file)
+    writer = open_writer()
+    before = os.stat(data_file).st_ino
+    assert not writer.dirty
+    assert writer.save(graph) is False
+    writer.wait()
+    assert os.stat(data_file).st_ino == before
+
+
+def test_save_writes_edits_once(data_file, open_writer):
+    graph = load(data_file)
+    writer = open_writer()
+    edit(graph, writer, graph.text_edit("Shaper", "h0", "RENAMED", "new text"))
+    assert writer.dirty
+    assert writer.save(graph) is True
+    assert writer.save(graph) is False
+    writer.wait()
+    assert load(data_file).talent("Shaper", "h0").name == "RENAMED"
+    st = os.stat(data_file)
+    assert writer.written_stamp == (st.st_mtime_ns, st.st_size)
+    assert writer.saved_generation == writer.generation
+
+
+def test_autosave_appends_to_the_journal(data_file, open_writer):
+    graph = load(data_file)
+    writer = open_writer(journal=True)
+    records = [graph.connection_edit("Shaper", "h0", "h3"), graph.text_edit("Shaper", "h5", "A", "b")]
+    edit(graph, writer, records[0])
+    writer.autosave(graph)
+    edit(graph, writer, records[1])
+    writer.autosave(graph)
+    writer.autosave(graph)  # nothing new to append
+    writer.wait()
+    assert list(data_writer.read_journal(data_file)) == [tuple(json.loads(json.dumps(r))) for r in records]
+    # The data file itself is untouched until a full save, which clears the journal
+    assert load(data_file).talent("Shaper", "h5").name == "IMMUTABLE"
+    writer.save(graph)
+    writer.wait()
+    assert not journal_path(data_file).exists()
+    assert load(data_file).to_dict() == graph.to_dict()
+
+
+def test_long_journal_is_compacted_into_a_full_save(data_file, open_writer):
+    graph = load(data_file)
+    writer = open_writer(journal=True, compact_every=2)
+    for talent_id in ("h0", "h2"):
+        edit(graph, writer, graph.text_edit("Shaper", talent_id, talent_id.upper(), ""))
+    writer.autosave(graph)
+    writer.wait()
+    assert journal_path(data_file).exists()
+    edit(graph, writer, graph.text_edit("Shaper", "h3", "H3", ""))
+    writer.autosave(graph)
+    writer.wait()
+    assert not journal_path(data_file).exists()
+    assert load(data_file).to_dict() == graph.to_dict()
+    assert not writer.dirty
+
+
+def test_replay_applies_journalled_edits(data_file, open_writer):
+    graph = load(data_file)
+    writer = open_writer(journal=True)
+    edit(graph, writer, graph.connection_edit("Shaper", "h0", "h3"))
+    edit(graph, writer, graph.swap_edit("Shaper", "h5", "h7"))
+    writer.close(graph)
+    replayed = load(data_file)
+    assert data_writer.replay_journal(replayed, data_file) == 2
+    assert replayed.to_dict() == graph.to_dict()
+
+
+def test_replay_stops_at_a_torn_last_line(data_file):
+    record = ("text", "Shaper", "h0", "BURDEN OF STONE", "", "KEPT", "")
+    journal_path(data_file).write_text(json.dumps(record) + "\n" + '["text", "Shaper", "h2", "RAD', encoding="utf-8")
+    graph = load(data_file)
+    assert data_writer.replay_journal(graph, data_file) == 1
+    assert graph.talent("Shaper", "h0").name == "KEPT"
+    assert graph.talent("Shaper", "h2").name == "RADIANT"
+
+
+def test_replay_skips_records_that_no_longer_resolve(data_file, capsys):
+    records = [
+        ("text", "Shaper", "gone", "", "", "X", ""),
+        ("connect", "NoSuchTree", "h0", "h1", True),
+        ("swap", "Shaper", "h0"),
+        ("connect", "Shaper", "h0", "h3", True),
+    ]
+    journal_path(data_file).write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    graph = load(data_file)
+    assert data_writer.replay_journal(graph, data_file) == 1
+    assert "h3" in graph.tree("Shaper").talents["h0"].out
+    assert "Skipped 3 journal record(s)" in capsys.readouterr().out
+
+
+def test_journal_left_by_an_earlier_session_is_unsaved(data_file, open_writer):
+    journal_path(data_file).write_text(json.dumps(("connect", "Shaper", "h0", "h3", True)) + "\n", encoding="utf-8")
+    graph = load(data_file)
+    data_writer.replay_journal(graph, data_file)
+    writer = open_writer()
+    assert writer.dirty and writer.unjournalled == 0
+    assert writer.save(graph) is True
+    writer.wait()
+    assert not journal_path(data_file).exists()
+    assert "h3" in load(data_file).tree("Shaper").talents["h0"].out
+
+
+def test_mark_reloaded_keeps_only_journalled_edits_unsaved(data_file, open_writer):
+    graph = load(data_file)
+    writer = open_writer(journal=True)
+    edit(graph, writer, graph.connection_edit("Shaper", "h0", "h3"))
+    writer.autosave(graph)
+    edit(graph, writer, graph.text_edit("Shaper", "h5", "LOST", ""))
+    assert writer.unjournalled == 1
+    writer.mark_reloaded()
+    assert writer.dirty and writer.unjournalled == 0
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from path_query import PathQuery
+from talent_model import TalentGraph
+from xp_engine import XPRules
+
+RULES = XPRules([4, 6, 8, 8, 10, 10], 8)
+
+
+def brute_force(tree, taken, target):
+    """(xp, length) of the cheapest chain to target, enumerating every prerequisite chain."""
+    best = None
+
+    def walk(talent_id, xp, length):
+        nonlocal best
+        if talent_id in taken:
+            best = min(best or (xp, length), (xp, length))
+            return
+        xp += RULES.talent_cost(tree.talents[talent_id])
+        length += 1
+        prereqs = tree.prerequisites(talent_id)
+        if not prereqs:
+            best = min(best or (xp, length), (xp, length))
+        for prereq in prereqs:
+            walk(prereq, xp, length)
+
+    walk(target, 0, 0)
+    return best
+
+
+def random_selection(tree, rng):
+    # Grow a selection that honours prerequisites, as a player would
+    selected = set()
+    for _ in range(rng.randrange(6)):
+        options = [t.id for t in tree if t.id not in selected
+                   and (not tree.prerequisites(t.id) or tree.prerequisites(t.id) & selected)]
+        if options:
+            selected.add(rng.choice(options))
+    return selected
+
+
+@pytest.fixture(scope="module")
+def graph(shipped_data):
+    return TalentGraph.from_dict(shipped_data)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_brute_force(graph, seed):
+    rng = random.Random(seed)
+    query = PathQuery(graph, RULES)
+    tree = rng.choice(graph.trees)
+    taken = random_selection(tree, rng)
+    others = {(f"Other{i}", "x") for i in range(rng.randrange(3))}
+    selected = {(tree.name, talent_id) for talent_id in taken} | others
+    target = rng.choice(list(tree.talents))
+
+    xp, path = query.cheapest_path(tree.name, target, selected)
+
+    trees = len({tree_name for tree_name, _ in selected})
+    surcharge = RULES.tree_surcharge(trees + 1) - RULES.tree_surcharge(trees) if path and not taken else 0
+    assert (xp - surcharge, len(path)) == brute_force(tree, taken, target)
+    # The path is takeable in order and ends at the target
+    have = set(taken)
+    for talent_id in path:
+        prereqs = tree.prerequisites(talent_id)
+        assert not prereqs or prereqs & have
+        have.add(talent_id)
+    assert not path or path[-1] == target
+
+
+def test_selected_target_costs_nothing(graph):
+    tree = graph.trees[0]
+    talent_id = next(iter(tree.talents))
+    assert PathQuery(graph, RULES).cheapest_path(tree.name, talent_id, {(tree.name, talent_id)}) == (0, [])
+
+
+def test_tables_are_cached_per_selection_and_invalidated_per_tree(graph):
+    query = PathQuery(graph, RULES)
+    first, second = graph.trees[0], graph.trees[1]
+    query.cheapest_path(first.name, next(iter(first.talents)), set())
+    query.cheapest_path(first.name, list(first.talents)[-1], set())
+    query.cheapest_path(second.name, next(iter(second.talents)), set())
+    assert (query.hits, query.misses) == (1, 2)
+
+    query.invalidate(first.name)
+    query.cheapest_path(second.name, next(iter(second.talents)), set())
+    query.cheapest_path(first.name, next(iter(first.talents)), set())
+    assert (query.hits, query.misses) == (2, 3)
+
+
+def test_per_tree_cache_is_bounded(graph):
+    query = PathQuery(graph, RULES, per_tree=2)
+    tree = graph.trees[0]
+    ids = list(tree.talents)
+    for talent_id in ids[:4]:
+        query.cheapest_path(tree.name, ids[-1], {(tree.name, talent_id)})
+    assert len(query._tables[tree.name]) == 2
+
+
+def test_path_to_tier_0_skips_the_root(graph):
+    # Shaper's root connects to h0, but nobody has to click it first
+    xp, path = PathQuery(graph, RULES).cheapest_path("Shaper", "h0", set())
+    assert path == ["h0"]
+    assert xp == RULES.tier_cost(0)
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from talent_model import TalentGraph, invert_edit
+
+
+def test_root_is_never_a_prerequisite(shipped_data):
+    # Shaper's root connects to h0, h3 and h2, but tier 0 talents stay entry points
+    tree = TalentGraph.from_dict(shipped_data).tree("Shaper")
+    root = tree.talents["h30"]
+    assert root.is_root and {"h0", "h2", "h3"} <= tree.neighbours("h30")
+    for talent_id in ("h0", "h2", "h3"):
+        assert tree.prerequisites(talent_id) == set()
+    assert tree.prerequisites("h5") == {"h0"}
+
+
+def test_trees_with_and_without_root_connections_agree(shipped_data):
+    graph = TalentGraph.from_dict(shipped_data)
+    for tree in graph:
+        for talent in tree:
+            if talent.position[0] == 0:
+                assert tree.prerequisites(talent.id) == set(), (tree.name, talent.id)
+
+
+@pytest.mark.parametrize("make", [
+    lambda g: g.connection_edit("Shaper", "h0", "h3"),   # adds an edge
+    lambda g: g.connection_edit("Shaper", "h5", "h0"),   # removes h0 -> h5
+    lambda g: g.swap_edit("Shaper", "h5", "h7"),
+    lambda g: g.text_edit("Shaper", "h0", "NEW", "new text"),
+])
+def test_invert_edit_undoes_the_edit(shipped_data, make):
+    graph = TalentGraph.from_dict(shipped_data)
+    before = graph.to_dict()
+    record = make(graph)
+    graph.apply_edit(record)
+    assert graph.to_dict() != before
+    graph.apply_edit(invert_edit(record))
+    assert graph.to_dict() == before
+    # Journalled records come back with lists for tuples and must invert the same way
+    graph.apply_edit(record)
+    graph.apply_edit(invert_edit(tuple(json.loads(json.dumps(record)))))
+    assert graph.to_dict() == before
+    assert invert_edit(invert_edit(record)) == record
+
+
+def test_invert_edit_rejects_unknown_records():
+    with pytest.raises(ValueError):
+        invert_edit(("move", "Shaper", "h0"))
@@ -0,0 +1,56 @@
+"""Tile geometry and colours shared by the GUI and the headless exporter.
+
+A normal talent at (column, row) sits on a fixed grid; the tree's root
+talent (negative position) gets a larger tile at a fixed spot on the left.
+Connection lines run between per-tile anchor points.
+"""
+
+# Colours
+default_tile_clr = "#3A5768"
+tile_hlight_clr = "#3aa7c9"   # selected talent
+line_clr = "#76d8ff"
+canvas_bg = "#252525"
+
+# Tile sizes; the root tile is root_scale times larger
+btn_width = 165
+btn_height = 100
+root_scale = (1.2, 2.5)
+initial_tile_posx = 30
+initial_tile_posy = 300
+
+# Grid of normal tiles: column/row -> canvas position
+tile_x_offset = 275
+tile_y_offset = 30
+tile_x_spacing = 200
+tile_y_spacing = 170
+
+
+def tile_rect(position):
+    """Return (x, y, width, height) of the tile for a talent position."""
+    x, y = position
+    # Exception for the main tree talent (denoted by negative position)
+    if x < 0 and y < 0:
+        return initial_tile_posx, initial_tile_posy, btn_width * root_scale[0], btn_height * root_scale[1]
+    return tile_x_offset + x * tile_x_spacing, tile_y_offset + y * tile_y_spacing, btn_width, btn_height
+
+
+def line_offsets(x_pos, initial_x=initial_tile_posx, width=btn_width, height=btn_height):
+    """Offset of a tile's line anchor from its top-left corner, based on x-position."""
+    # Exception for initial tree tile
+    if x_pos == initial_x:
+        return width * 0, height * 1.35
+    return width / 2, height / 1.5
+
+
+def tile_anchor(px, py):
+    offset_x, offset_y = line_offsets(px)
+    return px + offset_x, py + offset_y
+
+
+def tree_extent(tree):
+    """(width, height) a canvas needs to show every tile of tree, with a margin."""
+    right = bottom = 0
+    for talent in tree:
+        px, py, width, height = tile_rect(talent.position)
+        right, bottom = max(right, px + width), max(bottom, py + height)
+    return right + initial_tile_posx, bottom + tile_y_offset
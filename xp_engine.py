@@ -0,0 +1,137 @@
+"""XP accounting for a set of selected talents.
+
+Cost rules: a talent costs the XP value of its tier (column); the main tree
+talent (negative position) is free; every distinct tree beyond the first
+``free_trees`` adds a flat ``tree_xp_cost`` surcharge.
+
+XPEngine keeps per-tree selection counts and per-tier counts so a toggle
+updates the total in O(1), and a whole selection (e.g. a character file) is
+costed in one pass. Nothing here imports tkinter.
+"""
+
+DEFAULT_TIER_XP_VALUES = (4, 6, 8, 8, 10, 10)
+DEFAULT_TREE_XP_COST = 8
+
+
+class XPRules:
+    __slots__ = ("tier_xp_values", "tree_xp_cost", "free_trees")
+
+    def __init__(self, tier_xp_values=DEFAULT_TIER_XP_VALUES, tree_xp_cost=DEFAULT_TREE_XP_COST, free_trees=2):
+        self.tier_xp_values = list(tier_xp_values)
+        self.tree_xp_cost = tree_xp_cost
+        self.free_trees = free_trees
+
+    def tier_cost(self, column):
+        # Exception for initial tree talent (negative position)
+        if column < 0:
+            return 0
+        return self.tier_xp_values[column]
+
+    def talent_cost(self, talent):
+        return self.tier_cost(talent.position[0])
+
+    def tree_surcharge(self, tree_count):
+        return max(0, tree_count - self.free_trees) * self.tree_xp_cost
+
+    def total(self, tier_counts, tree_count):
+        """XP for per-tier selection counts ({column: count}) spread over tree_count trees."""
+        return sum(self.tier_cost(c) * n for c, n in tier_counts.items()) + self.tree_surcharge(tree_count)
+
+
+class XPEngine:
+    __slots__ = ("graph", "rules", "selected", "tree_counts", "tier_counts", "talent_xp", "_columns")
+
+    def __init__(self, graph, rules=None):
+        self.graph = graph
+        self.rules = rules or XPRules()
+        self.clear()
+
+    def clear(self):
+        self.selected = set()     # {(tree_name, talent_id)}
+        self.tree_counts = {}     # {tree_name: selected talents in that tree}
+        self.tier_counts = {}     # {column: selected talents in that tier}
+        self.talent_xp = 0        # sum of tier costs of the selection
+        self._columns = {}        # {(tree_name, talent_id): column it was costed at}
+
+    #==== Totals ====
+    @property
+    def spent(self):
+        return self.talent_xp + self.rules.tree_surcharge(len(self.tree_counts))
+
+    def remaining(self, xp_total):
+        return xp_total - self.spent
+
+    def cost_of(self, selection):
+        """Cost an arbitrary selection in one pass without touching engine state."""
+        tier_counts = {}
+        trees = set()
+        for tree_name, talent_id in selection:
+            column = self.graph.talent(tree_name, talent_id).position[0]
+            tier_counts[column] = tier_counts.get(column, 0) + 1
+            trees.add(tree_name)
+        return self.rules.total(tier_counts, len(trees))
+
+    #==== Selection changes ====
+    def add(self, tree_name, talent_id):
+        key = (tree_name, talent_id)
+        if key in self.selected:
+            return
+        column = self.graph.talent(tree_name, talent_id).position[0]
+        self.selected.add(key)
+        self._columns[key] = column
+        self.tree_counts[tree_name] = self.tree_counts.get(tree_name, 0) + 1
+        self.tier_counts[column] = self.tier_counts.get(column, 0) + 1
+        self.talent_xp += self.rules.tier_cost(column)
+
+    def remove(self, tree_name, talent_id):
+        key = (tree_name, talent_id)
+        if key not in self.selected:
+            return
+        column = self._columns.pop(key)
+        self.selected.remove(key)
+        self.tree_counts[tree_name] -= 1
+        if not self.tree_counts[tree_name]:
+            del self.tree_counts[tree_name]
+        self.tier_counts[column] -= 1
+        self.talent_xp -= self.rules.tier_cost(column)
+
+    def toggle(self, tree_name, talent_id):
+        """Select or unselect a talent. Returns True if it is now selected."""
+        if (tree_name, talent_id) in self.selected:
+            self.remove(tree_name, talent_id)
+            return False
+        self.add(tree_name, talent_id)
+        return True
+
+    def retier(self, tree_name, talent_id):
+        # Re-cost a selected talent whose position changed (e.g. a position swap)
+        if (tree_name, talent_id) in self.selected:
+            self.remove(tree_name, talent_id)
+            self.add(tree_name, talent_id)
+
+    def load(self, selection):
+        """Replace the selection in one batched pass.
+
+        Returns the (tree_name, talent_id) keys that don't exist in the graph;
+        those are skipped.
+        """
+        self.clear()
+        unknown = []
+        tier_counts = self.tier_counts
+        tree_counts = self.tree_counts
+        for tree_name, talent_id in selection:
+            tree = self.graph.trees_by_name.get(tree_name)
+            talent = tree.talents.get(talent_id) if tree else None
+            if talent is None:
+                unknown.append((tree_name, talent_id))
+                continue
+            key = (tree_name, talent_id)
+            if key in self.selected:
+                continue
+            column = talent.position[0]
+            self.selected.add(key)
+            self._columns[key] = column
+            tree_counts[tree_name] = tree_counts.get(tree_name, 0) + 1
+            tier_counts[column] = tier_counts.get(column, 0) + 1
+        self.talent_xp = sum(self.rules.tier_cost(c) * n for c, n in tier_counts.items())
+        return unknown